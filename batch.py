@@ -0,0 +1,205 @@
+"""Пакетная обработка проектов без графического интерфейса.
+
+Для каждого файла проекта в каталоге записывает рассчитанные метрики,
+рекомендации и отчёт Word (и при необходимости PDF). Файлы обрабатываются в пуле процессов;
+неизменившиеся с прошлого запуска файлы пропускаются.
+
+    python batch.py КАТАЛОГ [-o КАТАЛОГ_РЕЗУЛЬТАТОВ] [-j ПРОЦЕССОВ] [--force] [--no-charts] [--pdf]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import matplotlib
+matplotlib.use("Agg")
+from view.project_io import read_project, STREAMING_EXTENSIONS
+from view.project_dataset import ProjectDataset
+from view import charts, knowledge_base, pdf_report, recommendation_engine, report_builder, report_cache
+
+
+PROJECT_EXTENSIONS = STREAMING_EXTENSIONS + (".json", ".xlsx")
+MANIFEST_NAME = "batch_manifest.json"
+
+METRICS_FILE = "metrics.csv"
+RECOMMENDATIONS_FILE = "recommendations.csv"
+REPORT_FILE = "report.docx"
+PDF_REPORT_FILE = "report.pdf"
+
+# Этапы обработки файла в порядке выполнения — столбцы сводки
+STEPS = ["Загрузка", "Метрики", "Рекомендации", "Отчёт"]
+
+
+def find_projects(input_dir):
+    """Файлы проектов каталога, крупные — первыми, чтобы равномернее загрузить пул"""
+    paths = [
+        os.path.join(input_dir, name) for name in os.listdir(input_dir)
+        if name.lower().endswith(PROJECT_EXTENSIONS) and os.path.isfile(os.path.join(input_dir, name))
+    ]
+    return sorted(paths, key=lambda path: (-os.path.getsize(path), path))
+
+
+def output_dir_for(output_root, file_path):
+    """Каталог результатов файла: p1.csv -> p1_csv (файлы с одним именем не пересекаются)"""
+    stem, ext = os.path.splitext(os.path.basename(file_path))
+    return os.path.join(output_root, f"{stem}_{ext.lstrip('.').lower()}")
+
+
+def input_signature(file_path, with_charts, with_pdf):
+    """Признак неизменности входных данных: файл проекта, базы знаний и состав отчёта"""
+    stat = os.stat(file_path)
+    return [
+        stat.st_size, stat.st_mtime_ns,
+        knowledge_base.source_mtime(recommendation_engine.DEFAULT_RULES_PATH),
+        knowledge_base.source_mtime(),
+        with_charts, with_pdf,
+    ]
+
+
+def load_manifest(output_root):
+    try:
+        with open(os.path.join(output_root, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_root, manifest):
+    path = os.path.join(output_root, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def is_up_to_date(manifest, file_path, out_dir, signature, with_pdf):
+    entry = manifest.get(os.path.abspath(file_path))
+    reports = [REPORT_FILE, PDF_REPORT_FILE] if with_pdf else [REPORT_FILE]
+    return (
+        entry is not None and entry["signature"] == signature
+        and all(os.path.exists(os.path.join(out_dir, name)) for name in reports)
+    )
+
+
+def process_project(file_path, out_dir, with_charts=True, with_pdf=False):
+    """Обрабатывает один файл проекта; возвращает (число этапов, {этап обработки: секунды})"""
+    timings = {}
+    started = time.perf_counter()
+    project_data = read_project(file_path)
+    dataset = ProjectDataset(project_data)
+    timings["Загрузка"] = time.perf_counter() - started
+    os.makedirs(out_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    calc_data = report_builder.project_metrics(dataset)
+    metrics_path = os.path.join(out_dir, METRICS_FILE)
+    if calc_data is not None:
+        calc_data[report_builder.METRIC_COLUMNS].to_csv(metrics_path, index=False, encoding="utf-8-sig")
+    elif os.path.exists(metrics_path):
+        os.remove(metrics_path)  # метрики прежней версии файла устарели
+    timings["Метрики"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rules = recommendation_engine.load_rules()
+    result = report_builder.project_recommendations(calc_data, rules)
+    with open(os.path.join(out_dir, RECOMMENDATIONS_FILE), "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Этап"] + recommendation_engine.TEXT_FIELDS)
+        if result is not None:
+            writer.writerows(recommendation_engine.to_rows(result, rules=rules))
+    timings["Рекомендации"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    snapshot = report_builder.ReportSnapshot(project_data, calc_data, result, rules)
+    # Процесс уже работает в пуле — графики строятся последовательно
+    report_builder.build_word_report(
+        os.path.join(out_dir, REPORT_FILE), snapshot, with_charts=with_charts, parallel_charts=False
+    )
+    if with_pdf:
+        pdf_report.build_pdf_report(os.path.join(out_dir, PDF_REPORT_FILE), snapshot, with_charts=with_charts)
+    # Разделы уже использованы обоими отчётами — в следующем файле они не пригодятся
+    report_cache.sections.clear()
+    timings["Отчёт"] = time.perf_counter() - started
+    return len(dataset), timings
+
+
+def print_summary(results, elapsed):
+    name_width = max([len("Файл")] + [len(os.path.basename(path)) for path, _ in results])
+    header = f"{'Файл':<{name_width}}  {'Статус':<9} {'Этапов':>8}" + "".join(f" {step:>12}" for step in STEPS)
+    print(header + f" {'Всего, с':>10}")
+    print("-" * (len(header) + 11))
+    for path, (status, rows, timings) in results:
+        line = f"{os.path.basename(path):<{name_width}}  {status:<9} {rows if rows is not None else '':>8}"
+        line += "".join(f" {timings[step]:>12.2f}" if step in timings else f" {'':>12}" for step in STEPS)
+        total = sum(timings.values())
+        print(line + (f" {total:>10.2f}" if timings else ""))
+    processed = sum(1 for _, (status, _, _) in results if status == "готово")
+    skipped = sum(1 for _, (status, _, _) in results if status == "пропущен")
+    failed = len(results) - processed - skipped
+    print(f"\nОбработано: {processed}, пропущено: {skipped}, ошибок: {failed}. Время: {elapsed:.2f} с")
+
+
+def run(input_dir, output_root, jobs=None, force=False, with_charts=True, with_pdf=False):
+    """Обрабатывает каталог проектов; возвращает {путь: (статус, этапов, время этапов)}"""
+    started = time.perf_counter()
+    os.makedirs(output_root, exist_ok=True)
+    manifest = load_manifest(output_root)
+    results = {}
+    pending = []
+    for file_path in find_projects(input_dir):
+        out_dir = output_dir_for(output_root, file_path)
+        signature = input_signature(file_path, with_charts, with_pdf)
+        if not force and is_up_to_date(manifest, file_path, out_dir, signature, with_pdf):
+            results[file_path] = ("пропущен", manifest[os.path.abspath(file_path)].get("rows"), {})
+        else:
+            pending.append((file_path, out_dir, signature))
+
+    def finish(file_path, signature, get_result):
+        try:
+            rows, timings = get_result()
+        except Exception as e:
+            print(f"[{os.path.basename(file_path)}]: {e}", file=sys.stderr)
+            results[file_path] = ("ошибка", None, {})
+            manifest.pop(os.path.abspath(file_path), None)
+        else:
+            results[file_path] = ("готово", rows, timings)
+            manifest[os.path.abspath(file_path)] = {"signature": signature, "rows": rows}
+        save_manifest(output_root, manifest)
+
+    jobs = min(jobs or charts.available_cpus(), len(pending))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                executor.submit(process_project, file_path, out_dir, with_charts, with_pdf): (file_path, signature)
+                for file_path, out_dir, signature in pending
+            }
+            for future in as_completed(futures):
+                finish(*futures[future], future.result)
+    else:
+        # Один процесс — без накладных расходов пула
+        for file_path, out_dir, signature in pending:
+            finish(file_path, signature, lambda: process_project(file_path, out_dir, with_charts, with_pdf))
+
+    ordered = [(path, results[path]) for path in sorted(results)]
+    print_summary(ordered, time.perf_counter() - started)
+    return dict(ordered)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетный расчёт метрик, рекомендаций и отчётов по проектам")
+    parser.add_argument("input_dir", help="каталог с файлами проектов")
+    parser.add_argument("-o", "--output", help="каталог результатов (по умолчанию КАТАЛОГ/results)")
+    parser.add_argument("-j", "--jobs", type=int, help="число процессов (по умолчанию — число доступных ядер)")
+    parser.add_argument("--force", action="store_true", help="обработать и неизменившиеся файлы")
+    parser.add_argument("--no-charts", action="store_true", help="не добавлять графики в отчёты")
+    parser.add_argument("--pdf", action="store_true", help="сохранять отчёт также в PDF")
+    args = parser.parse_args(argv)
+    output_root = args.output or os.path.join(args.input_dir, "results")
+    results = run(args.input_dir, output_root, args.jobs, args.force, not args.no_charts, args.pdf)
+    return 1 if any(status == "ошибка" for status, _, _ in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
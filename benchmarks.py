@@ -0,0 +1,531 @@
+"""Бенчмарки этапов экспертной системы.
+
+Набор бенчмарков на синтетических проектах — время каждого этапа
+(разбор файлов, метрики, рекомендации, графики, отчёт Word) в JSON
+для сравнения запусков:
+
+    python benchmarks.py [-s ЭТАПОВ ...] [-o РЕЗУЛЬТАТ.json] [--compare ПРЕЖНИЙ.json]
+
+Сравнение с исходными построчными реализациями:
+
+    python benchmarks.py --legacy [-s ЭТАПОВ ...] [--legacy-limit СТРОК]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import matplotlib
+import numpy as np
+import pandas as pd
+from docx import Document
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from view import charts, recommendation_engine, report_builder, report_cache
+from view.formatting import format_value
+from view.project_dataset import ProjectDataset
+from view.project_io import DATE_COLUMNS, read_project
+
+
+def make_metrics(n, seed=0):
+    """Синтетические метрики ΔT, ΔC, E, включая граничные и пустые значения"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Этап": [f"Этап {i}" for i in range(n)],
+        "ΔT": rng.normal(5, 20, n).round(rng.integers(0, 3)),
+        "ΔC": rng.normal(3, 12, n),
+        "E": rng.normal(0, 0.2, n),
+    })
+    # Граничные значения порогов, NaN и бесконечности
+    edge = [10.0, 0.0, -0.0, 0.1, -0.1, np.nan, np.inf, -np.inf]
+    for i, value in enumerate(edge[:n]):
+        df.loc[i, ["ΔT", "ΔC", "E"]] = value
+    return df
+
+
+# Ответственные синтетических проектов; нагрузка распределена неравномерно (закон Ципфа)
+RESPONSIBLE = [
+    "Иванов", "Петров", "Сидоров", "Кузнецов", "Смирнов", "Попов",
+    "Васильев", "Соколов", "Михайлов", "Новиков", "Фёдоров", "Морозов",
+]
+
+
+def make_project(n, seed=0):
+    """Синтетический проект из n этапов в формате импортируемой таблицы.
+
+    Этапы начинаются по порядку в течение двух лет; длительности и дневная
+    стоимость распределены логнормально (много коротких этапов, длинный хвост),
+    начало по факту чаще сдвигается на более поздний срок, чем на ранний,
+    перерасход сроков и бюджета в среднем небольшой, но с выбросами.
+    """
+    rng = np.random.default_rng(seed)
+    day = pd.to_timedelta(1, unit="D")
+    start = pd.Timestamp("2024-01-01") + np.sort(rng.integers(0, 730, n)) * day
+    plan_days = np.clip(np.rint(rng.lognormal(np.log(12), 0.7, n)), 1, 365)
+    delay_days = np.rint(rng.gamma(1.5, 3.0, n)) - 2
+    fact_days = np.maximum(np.rint(plan_days * rng.lognormal(0.08, 0.3, n)), 1)
+    fact_start = start + delay_days * day
+    budget = np.maximum(np.round(plan_days * rng.lognormal(np.log(40_000), 0.5, n), -3), 1000.0)
+    weights = 1 / np.arange(1, len(RESPONSIBLE) + 1)
+    return pd.DataFrame({
+        "Этап": [f"Этап {i}" for i in range(n)],
+        "Ответственный": pd.Categorical(rng.choice(RESPONSIBLE, n, p=weights / weights.sum())),
+        "Дата начала": start,
+        "Дата окончания": start + plan_days * day,
+        "Факт начала": fact_start,
+        "Факт окончания": fact_start + fact_days * day,
+        "План. бюджет": budget,
+        "Факт. бюджет": (budget * rng.lognormal(0.04, 0.15, n)).round(2),
+        "Ресурсы": (1 + rng.poisson(2 + plan_days / 5)).astype("float64"),
+    })
+
+
+def legacy_recommendations(df):
+    """Построчная генерация рекомендаций в исходном виде (эталон для сравнения)"""
+    recommendations = []
+
+    for i in range(len(df)):
+        stage = df.iloc[i]["Этап"]
+        delta_t = df.iloc[i]["ΔT"]  # Отклонение по времени в %
+        delta_c = df.iloc[i]["ΔC"]  # Перерасход бюджета в %
+        e = df.iloc[i]["E"]         # Эффективность ресурсов
+        reason = ""
+        recommendation = ""
+        effect = ""
+        problem = ""
+        # Проблема по срокам
+        if delta_t > 10:
+            problem = f"Задержка по срокам: превышение на {delta_t:.2f}% от плана"
+            reason = "Значительное превышение сроков выполнения этапа. Возможные причины: нехватка ресурсов, задержки поставок, ошибки в планировании."
+            recommendation = (
+                "Провести анализ причин задержки: проверить наличие всех необходимых ресурсов, "
+                "оценить работу поставщиков, пересмотреть план-график. Рассмотреть возможность привлечения "
+                "дополнительных исполнителей или перераспределения задач между сотрудниками."
+            )
+            effect = f"Ожидаемое сокращение задержки: с {delta_t:.2f}% до {delta_t*0.5:.2f}%"
+            recommendations.append([
+                str(stage),
+                problem,
+                reason,
+                recommendation,
+                effect
+            ])
+        elif 0 < delta_t <= 10:
+            problem = f"Небольшая задержка: превышение на {delta_t:.2f}% от плана"
+            reason = "Небольшое превышение сроков. Возможные причины: незначительные организационные сбои, погодные условия, неэффективное распределение задач."
+            recommendation = (
+                "Провести оперативное совещание с командой, скорректировать приоритеты, "
+                "при необходимости временно увеличить рабочее время или привлечь дополнительные ресурсы."
+            )
+            effect = f"Ожидаемое сокращение задержки: с {delta_t:.2f}% до {delta_t*0.5:.2f}%"
+            recommendations.append([
+                str(stage),
+                problem,
+                reason,
+                recommendation,
+                effect
+            ])
+        elif delta_t < 0:
+            problem = f"Опережение графика: выполнение быстрее на {-delta_t:.2f}%"
+            reason = "Работы выполнены с опережением графика. Возможные причины: высокая мотивация персонала, оптимизация процессов."
+            recommendation = (
+                "Зафиксировать успешные практики, поощрить команду, рассмотреть возможность перераспределения "
+                "освободившихся ресурсов на другие этапы или проекты."
+            )
+            effect = f"Потенциал ускорения других этапов: до {-delta_t:.2f}%"
+            recommendations.append([
+                str(stage),
+                problem,
+                reason,
+                recommendation,
+                effect
+            ])
+        # Проблема по бюджету
+        if delta_c > 10:
+            problem = f"Перерасход бюджета: превышение на {delta_c:.2f}% от плана"
+            reason = "Существенный перерасход бюджета. Возможные причины: рост цен, дополнительные работы, ошибки в смете."
+            recommendation = (
+                "Провести детальный анализ затрат, выявить статьи перерасхода, согласовать корректировку бюджета с руководством. "
+                "Проверить договоры с поставщиками, рассмотреть альтернативные варианты закупок."
+            )
+            effect = f"Ожидаемое снижение перерасхода: с {delta_c:.2f}% до {delta_c*0.5:.2f}%"
+            recommendations.append([
+                str(stage),
+                problem,
+                reason,
+                recommendation,
+                effect
+            ])
+        elif 0 < delta_c <= 10:
+            problem = f"Умеренный перерасход бюджета: превышение на {delta_c:.2f}% от плана"
+            reason = "Умеренный перерасход бюджета. Возможные причины: незначительные дополнительные расходы, корректировки в процессе."
+            recommendation = (
+                "Провести сверку сметы, оптимизировать закупки, пересмотреть условия договоров, "
+                "контролировать расходы на следующих этапах."
+            )
+            effect = f"Ожидаемое снижение перерасхода: с {delta_c:.2f}% до {delta_c*0.5:.2f}%"
+            recommendations.append([
+                str(stage),
+                problem,
+                reason,
+                recommendation,
+                effect
+            ])
+        elif delta_c < 0:
+            problem = f"Экономия бюджета: снижение затрат на {-delta_c:.2f}% от плана"
+            reason = "Экономия бюджета. Возможные причины: скидки, оптимизация закупок, эффективное управление."
+            recommendation = (
+                "Зафиксировать успешные решения, рассмотреть возможность перераспределения сэкономленных средств "
+                "на другие этапы или проекты."
+            )
+            effect = f"Потенциал экономии: {-delta_c:.2f}%"
+            recommendations.append([
+                str(stage),
+                problem,
+                reason,
+                recommendation,
+                effect
+            ])
+        # Проблема по эффективности
+        if e < -0.1:
+            problem = f"Низкая эффективность ресурсов: показатель {e:.2f} (ниже нормы)"
+            reason = "Низкая эффективность использования ресурсов. Возможные причины: простаивание техники, неравномерная загрузка персонала."
+            recommendation = (
+                "Провести аудит загрузки ресурсов, выявить и устранить узкие места, "
+                "перепланировать график работ для равномерного распределения нагрузки."
+            )
+            effect = "Ожидаемый рост эффективности: до нормы"
+            recommendations.append([
+                str(stage),
+                problem,
+                reason,
+                recommendation,
+                effect
+            ])
+        elif e > 0.1:
+            problem = f"Высокая эффективность ресурсов: показатель {e:.2f} (выше нормы)"
+            reason = "Высокая эффективность использования ресурсов. Возможные причины: грамотное планирование, автоматизация процессов."
+            recommendation = (
+                "Использовать выявленные эффективные подходы на других этапах, "
+                "поощрить команду, внедрять лучшие практики в будущих проектах."
+            )
+            effect = "Возможность тиражирования успешных практик"
+            recommendations.append([
+                str(stage),
+                problem,
+                reason,
+                recommendation,
+                effect
+            ])
+        else:
+            problem = f"Эффективность ресурсов в норме: показатель {e:.2f}"
+            reason = "Эффективность ресурсов в пределах нормы."
+            recommendation = "Действия не требуются. Продолжать работу по текущему плану."
+            effect = "Стабильная работа, изменений не требуется"
+            recommendations.append([
+                str(stage),
+                problem,
+                reason,
+                recommendation,
+                effect
+            ])
+
+
+    return recommendations
+
+
+def timed(func, *args, repeat=3):
+    """Лучшее время из нескольких запусков и результат последнего"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_recommendations(n):
+    df = make_metrics(n)
+    legacy_time, legacy = timed(legacy_recommendations, df, repeat=1)
+    vector_time, result = timed(recommendation_engine.evaluate, df)
+
+    # Результат должен совпадать с исходными правилами построчно
+    rows = recommendation_engine.to_rows(recommendation_engine.with_stage_names(result, df["Этап"]))
+    assert rows == legacy, "Результаты векторного движка расходятся с исходными правилами"
+
+    print(
+        f"Рекомендации, {n} этапов: построчно {legacy_time:.3f} с, "
+        f"векторно {vector_time:.4f} с, ускорение x{legacy_time / vector_time:.0f}"
+    )
+
+
+def bench_gantt(n):
+    df = ProjectDataset(make_project(n)).frame
+    figure = Figure(figsize=(10, 5))
+    canvas = FigureCanvasAgg(figure)
+
+    def build():
+        figure.clear()
+        charts.plot_gantt(figure, df)
+        figure.tight_layout()
+        canvas.draw()
+
+    build_time, _ = timed(build)
+    redraw_time, _ = timed(canvas.draw)
+    mode = "Rectangle" if n <= charts.GANTT_BAR_LIMIT else "PolyCollection"
+    print(f"Гантт, {n} этапов ({mode}): построение {build_time:.3f} с, перерисовка {redraw_time:.3f} с")
+
+
+def legacy_docx_table(doc, project_data):
+    """Заполнение таблицы отчёта по ячейкам в исходном виде (эталон для сравнения).
+
+    Значения форматируются так же, как в отчёте (format_value), чтобы тексты
+    ячеек можно было сравнить с таблицей, собранной целиком.
+    """
+    table = doc.add_table(rows=1 + len(project_data), cols=len(project_data.columns))
+    table.style = "Table Grid"
+    for j, col in enumerate(project_data.columns):
+        table.rows[0].cells[j].text = col
+    for i, row in project_data.iterrows():
+        for j, val in enumerate(row):
+            table.rows[i + 1].cells[j].text = format_value(val)
+    return table
+
+
+def table_texts(table):
+    """Тексты ячеек таблицы построчно, в том виде, в каком их читает python-docx"""
+    return [[cell.text for cell in row.cells] for row in table.rows]
+
+
+# Строк, выше которых таблица Word по ячейкам не заполняется (--legacy-limit)
+DOCX_LEGACY_LIMIT = 2_000
+
+
+def bench_docx_table(n, legacy_limit=DOCX_LEGACY_LIMIT):
+    """Раздел «Данные проекта»: заполнение по ячейкам и сборка XML таблицы целиком.
+
+    Заполнение по ячейкам растёт быстрее квадрата числа строк (2000 строк —
+    около двух минут), поэтому выше legacy_limit оно не измеряется.
+    """
+    df = make_project(n)
+    doc = Document()
+    bulk_time, _ = timed(report_builder.add_project_section, doc, df, repeat=1)
+    bulk_table = doc.tables[0]
+    if n > legacy_limit:
+        print(f"Таблица Word, {n} строк: целиком {bulk_time:.2f} с (по ячейкам не измерялось)")
+        return
+    legacy_time, legacy_table = timed(legacy_docx_table, Document(), df, repeat=1)
+    assert table_texts(bulk_table) == table_texts(legacy_table), "Тексты ячеек таблиц расходятся"
+    print(
+        f"Таблица Word, {n} строк: по ячейкам {legacy_time:.2f} с, "
+        f"целиком {bulk_time:.3f} с, ускорение x{legacy_time / bulk_time:.0f}"
+    )
+
+
+# Размеры синтетических проектов набора по умолчанию
+SUITE_SIZES = [10, 1_000, 100_000, 1_000_000]
+
+# Форматы файлов проекта, разбор которых измеряется
+SUITE_FORMATS = [".csv", ".json", ".xlsx"]
+
+# Выше этих размеров этап не измеряется: запись xlsx и отчёт Word
+# по миллиону этапов занимают десятки минут, а график времени выполнения
+# строит по столбцу на этап без прореживания
+SIZE_LIMITS = {
+    "parse_xlsx": 100_000,
+    "report_word": 100_000,
+    "report_word_cached": 100_000,
+    "chart:Время выполнения": 10_000,
+}
+
+# Проекты крупнее измеряются одним запуском, меньшие — лучшим из трёх
+SINGLE_RUN_SIZE = 100_000
+
+# Отклонение времени, начиная с которого сравнение отмечает изменение
+COMPARE_THRESHOLD = 0.1
+
+
+def write_project_file(df, path):
+    """Сохраняет проект в формате импорта; даты — строками, как в выгрузках"""
+    ext = os.path.splitext(path)[1]
+    if ext == ".xlsx":
+        df.to_excel(path, index=False)
+        return
+    df = df.copy()
+    for col in DATE_COLUMNS:
+        df[col] = df[col].dt.strftime("%Y-%m-%d")
+    if ext == ".csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_json(path, orient="records", force_ascii=False)
+
+
+def plot_offscreen(chart_type, df):
+    """Построение и отрисовка графика на внеэкранной фигуре Agg, как на странице анализа"""
+    figure = Figure(figsize=(10, 5))
+    canvas = FigureCanvasAgg(figure)
+    charts.PLOTTERS[chart_type](figure, df)
+    figure.tight_layout()
+    canvas.draw()
+
+
+def word_report(path, snapshot, cached):
+    if not cached:
+        report_cache.sections.clear()
+    report_builder.build_word_report(path, snapshot, parallel_charts=False)
+
+
+def run_suite(sizes, work_dir):
+    """Измеряет этапы на проектах каждого размера; возвращает записи результатов"""
+    results = []
+
+    def skip(name, n, reason):
+        results.append({"benchmark": name, "stages": n, "skipped": True, "reason": reason})
+        print(f"{name:<28} {n:>9} этапов: пропущен ({reason})")
+
+    def missing(**inputs):
+        """Имя первого этапа, не давшего результата, или None"""
+        return next((step for step, value in inputs.items() if value is None), None)
+
+    def measure(name, n, func, *args, rows=None, after=None):
+        """after — этап без результата: тогда зависящий от него этап не измеряется"""
+        if n > SIZE_LIMITS.get(name, n):
+            skip(name, n, f"выше {SIZE_LIMITS[name]}")
+            return None
+        if after is not None:
+            skip(name, n, f"нет результата этапа {after}")
+            return None
+        repeat = 1 if n > SINGLE_RUN_SIZE else 3
+        try:
+            seconds, result = timed(func, *args, repeat=repeat)
+        except Exception as e:
+            # Остальные этапы всё равно измеряются, но запуск завершится с ошибкой
+            results.append({"benchmark": name, "stages": n, "error": f"{type(e).__name__}: {e}"})
+            print(f"{name:<28} {n:>9} этапов: ошибка {type(e).__name__}: {e}")
+            return None
+        record = {"benchmark": name, "stages": n, "seconds": round(seconds, 6), "repeat": repeat}
+        if rows is not None:
+            record["rows"] = rows(result)
+        results.append(record)
+        print(f"{name:<28} {n:>9} этапов: {seconds:10.4f} с")
+        return result
+
+    for n in sizes:
+        project = make_project(n)
+        for ext in SUITE_FORMATS:
+            name = f"parse_{ext.lstrip('.')}"
+            if n > SIZE_LIMITS.get(name, n):
+                measure(name, n, None)
+                continue
+            path = os.path.join(work_dir, f"project_{n}{ext}")
+            write_project_file(project, path)
+            measure(name, n, read_project, path, rows=len)
+            os.remove(path)
+
+        # Этапы после сбоя metrics или recommendations записываются как пропущенные
+        dataset = measure("metrics", n, ProjectDataset, project, rows=len)
+        calc_data = report_builder.project_metrics(dataset) if dataset is not None else None
+        rules = recommendation_engine.load_rules()
+        result = measure(
+            "recommendations", n, report_builder.project_recommendations, calc_data, rules,
+            rows=len, after=missing(metrics=calc_data)
+        )
+        measure(
+            "recommendation_text", n, recommendation_engine.to_rows,
+            result, report_builder.REPORT_FIELDS, rules, rows=len, after=missing(recommendations=result)
+        )
+        for chart_type in charts.PLOTTERS:
+            measure(f"chart:{chart_type}", n, plot_offscreen, chart_type, calc_data, after=missing(metrics=calc_data))
+
+        after = missing(metrics=calc_data, recommendations=result)
+        snapshot = report_builder.ReportSnapshot(project, calc_data, result, rules) if after is None else None
+        path = os.path.join(work_dir, "report.docx")
+        measure("report_word", n, word_report, path, snapshot, False, after=after)
+        measure("report_word_cached", n, word_report, path, snapshot, True, after=after)
+        report_cache.sections.clear()
+    return results
+
+
+def environment():
+    """Версии и оборудование — результаты сравнимы только в одном окружении"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": charts.available_cpus(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results, previous):
+    """Печатает изменение времени этапов относительно прежнего запуска"""
+    old = {(r["benchmark"], r["stages"]): r.get("seconds") for r in previous["results"]}
+    print(f"\n{'Этап':<28} {'Этапов':>9} {'Было, с':>10} {'Стало, с':>10} {'Изменение':>10}")
+    for record in results:
+        before = old.get((record["benchmark"], record["stages"]))
+        if not before or "seconds" not in record:
+            continue
+        ratio = record["seconds"] / before
+        mark = ""
+        if ratio > 1 + COMPARE_THRESHOLD:
+            mark = "  медленнее"
+        elif ratio < 1 - COMPARE_THRESHOLD:
+            mark = "  быстрее"
+        print(
+            f"{record['benchmark']:<28} {record['stages']:>9} {before:>10.4f} "
+            f"{record['seconds']:>10.4f} {ratio:>9.2f}x{mark}"
+        )
+
+
+def run_legacy(sizes, docx_limit=DOCX_LEGACY_LIMIT):
+    for n in sizes:
+        bench_recommendations(n)
+    for n in sizes:
+        bench_gantt(n)
+    for n in sizes:
+        bench_docx_table(n, docx_limit)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки этапов обработки проекта")
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", help="число этапов синтетических проектов")
+    parser.add_argument("-o", "--output", default="benchmarks.json", help="файл результатов JSON")
+    parser.add_argument("--compare", help="результаты прежнего запуска для сравнения")
+    parser.add_argument("--legacy", action="store_true", help="сравнить с исходными построчными реализациями")
+    parser.add_argument(
+        "--legacy-limit", type=int, default=DOCX_LEGACY_LIMIT,
+        help=f"до скольких строк заполнять таблицу Word по ячейкам (по умолчанию {DOCX_LEGACY_LIMIT})"
+    )
+    args = parser.parse_args(argv)
+
+    if args.legacy:
+        run_legacy(args.sizes or [1_000, 10_000, 100_000], args.legacy_limit)
+        return 0
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_suite(args.sizes or SUITE_SIZES, work_dir)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты: {args.output}")
+    if previous is not None:
+        compare(results, previous)
+    failed = [record for record in results if "error" in record]
+    if failed:
+        print(f"\nЭтапов с ошибкой: {len(failed)}", file=sys.stderr)
+        for record in failed:
+            print(f"{record['benchmark']}, {record['stages']} этапов: {record['error']}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    matplotlib.use("Agg")
+    sys.exit(main())
@@ -1,13 +1,16 @@
-from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QTableWidget, QTableWidgetItem
+from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QTableView, QHeaderView
 from PyQt5.QtCore import Qt
-import pandas as pd
 from PyQt5.QtWidgets import QMessageBox
+from view.table_models import DataFrameModel
+from view.formatting import METRIC_FORMATTERS
+from view import tracing
 
 
 class CalculationsPage(QWidget):
     def __init__(self):
         super().__init__()
         self.data = None
+        self.data_version = None
         self.init_ui()
         self.calculations_data = None
 
@@ -28,7 +31,7 @@ class CalculationsPage(QWidget):
                 color: #4a4a4a;
                 margin-bottom: 18px;
             }
-            QTableWidget {
+            QTableView {
                 background: #f8fafc;
                 border: 1px solid #e0e7ef;
                 border-radius: 10px;
@@ -39,10 +42,10 @@ class CalculationsPage(QWidget):
                 gridline-color: #e0e7ef;
                 padding: 4px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: #b2ebf2;
                 color: #00796b;
             }
@@ -59,7 +62,7 @@ class CalculationsPage(QWidget):
                 word-break: break-word;
                 white-space: normal;
             }
-            QTableWidget QHeaderView {
+            QTableView QHeaderView {
                 font-size: 15px;
             }
         """)
@@ -78,70 +81,55 @@ class CalculationsPage(QWidget):
         layout.addWidget(self.description)
 
         # Таблица
-        self.table = QTableWidget()
+        self.table = QTableView()
+        self.table_model = DataFrameModel(columns=["Этап", "ΔT", "ΔC", "E"], formatters=METRIC_FORMATTERS)
+        self.table.setModel(self.table_model)
+        self.table.setSortingEnabled(True)
         layout.addWidget(self.table)
 
         self.setLayout(layout)
 
-    def set_data(self, data):
-        self.data = data
-        if data is not None:
-            self.calculate_metrics(data)
+    def set_data(self, dataset):
+        if dataset is not None and dataset.version == self.data_version:
+            return  # этот набор данных уже обработан
+        self.data = dataset
+        self.data_version = dataset.version if dataset is not None else None
+        if dataset is not None:
+            self.calculate_metrics(dataset)
         else:
             self.description.setText("Нет данных для расчёта.")
 
-    def calculate_metrics(self, df):
-        df = df.copy()
-
-        # Приведение дат к datetime
-        date_cols = ["Дата начала", "Дата окончания", "Факт начала", "Факт окончания"]
-        for col in date_cols:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-
+    def calculate_metrics(self, dataset):
         # Проверка на пустые значения
-        if df[date_cols].isna().any().any():
-
+        if not dataset.dates_valid:
+            # Метрики прежнего набора данных больше не актуальны
+            self.update_table(None)
+            self.calculations_data = None
             QMessageBox.warning(self, "Ошибка", "Некоторые даты указаны некорректно.")
             return
 
-        # Расчёт длительности
-        df["План длительность"] = (df["Дата окончания"] - df["Дата начала"]).dt.days
-        df["Факт длительность"] = (df["Факт окончания"] - df["Факт начала"]).dt.days
-
-        # ΔT — отклонение по времени (%)
-        df["ΔT"] = ((df["Факт длительность"] - df["План длительность"]) / df["План длительность"]) * 100
-
-        # ΔC — перерасход бюджета (%)
-        df["ΔC"] = ((df["Факт. бюджет"] - df["План. бюджет"]) / df["План. бюджет"]) * 100
-
-        # E — эффективность ресурсов
-        df["E"] = 1 - (df["План длительность"] / df["Факт длительность"])
-
-        # Округление
-        df[["ΔT", "ΔC", "E"]] = df[["ΔT", "ΔC", "E"]].round(2)
-
-        # Добавляем символ процента к ΔT и ΔC
-        df["ΔT"] = df["ΔT"].astype(str) + " %"
-        df["ΔC"] = df["ΔC"].astype(str) + " %"
-
-        self.update_table(df)
-        self.calculations_data = df.copy()
+        # Длительности, ΔT, ΔC и E уже рассчитаны в общем наборе данных.
+        # Метрики остаются числами float64, округление и символ процента
+        # добавляются только при отображении (METRIC_FORMATTERS)
+        df = dataset.frame
+
+        with tracing.span("Таблица метрик", rows=len(df)):
+            self.update_table(df)
+        self.calculations_data = df
+
+    def apply_changes(self, dataset, changes):
+        """Обновляет только изменённые строки таблицы метрик"""
+        if self.calculations_data is None or not dataset.dates_valid:
+            return  # метрики будут рассчитаны заново при показе страницы
+        self.data = dataset
+        self.data_version = dataset.version
+        # ΔT, ΔC и E пересчитаны набором данных только для изменённых этапов
+        self.calculations_data = dataset.frame
+        self.table_model.apply_changes(dataset.frame, changes)
 
     def update_table(self, df):
-        cols = ["Этап", "ΔT", "ΔC", "E"]
-        self.table.setColumnCount(len(cols))
-        self.table.setHorizontalHeaderLabels([
-            "Этап",
-            "ΔT",
-            "ΔC",
-            "E"
-        ])
-        self.table.setRowCount(df.shape[0])
-
-        for i in range(df.shape[0]):
-            for j, col in enumerate(cols):
-                item = QTableWidgetItem(str(df.iloc[i][col]))
-                self.table.setItem(i, j, item)
+        self.table_model.set_frame(df)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
 
         # Фиксируем ширину столбцов
         self.table.setColumnWidth(0, 180)  # Этап
@@ -149,7 +137,6 @@ class CalculationsPage(QWidget):
         self.table.setColumnWidth(2, 160)  # ΔC
         self.table.setColumnWidth(3, 140)  # E
 
-        from PyQt5.QtWidgets import QHeaderView
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
 
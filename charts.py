@@ -0,0 +1,673 @@
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+import matplotlib.dates as mdates
+from matplotlib.artist import setp
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+import numpy as np
+import pandas as pd
+from view import knowledge_base, tracing
+
+
+# Функции построения графиков не зависят от Qt: они рисуют в переданную фигуру
+# и используются как экранной страницей анализа, так и внеэкранным экспортом.
+
+# Графики, которые попадают в отчёты
+EXPORT_CHARTS = ["Гантт", "Затраты", "Ресурсы", "Отклонения", "Динамика бюджета"]
+
+# Столбцы, нужные графикам: в процессы экспорта передаются только они
+CHART_COLUMNS = [
+    "Этап", "Дата начала", "Дата окончания", "Факт начала", "Факт окончания",
+    "План. бюджет", "Факт. бюджет", "Ресурсы", "∆T_days"
+]
+
+# Статусы этапов на диаграмме Гантта и цвета их обводки
+STATUS_LABELS = ["Не начат", "В работе", "Выполнен", "Просрочен"]
+STATUS_COLORS = ["#b0bec5", "#42a5f5", "#66bb6a", "#ef5350"]
+
+# Выше этого числа этапов Гантт строится коллекциями, а не отдельными Rectangle
+GANTT_BAR_LIMIT = 100
+# Полосы этапа: план ниже, факт выше позиции этапа на GANTT_BAR_OFFSET
+GANTT_BAR_OFFSET = 0.2
+GANTT_BAR_HEIGHT = 0.3
+
+# Бюджет точек и подписей на графике: сверх него этапы агрегируются
+LOD_MAX_POINTS = 60
+# Число крупнейших секторов круговой диаграммы, остальные объединяются
+LOD_MAX_WEDGES = 12
+OTHER_LABEL = "Прочее"
+
+# Пул процессов экспорта создаётся при первом экспорте и переиспользуется
+_executor = None
+
+
+def gantt_statuses(df, today=None):
+    """Статус каждого этапа (коды STATUS_LABELS), вычисленный масками по столбцам"""
+    today = today if today is not None else pd.Timestamp.now().normalize()
+    fact_start, fact_end, plan_end = df["Факт начала"], df["Факт окончания"], df["Дата окончания"]
+    # Порядок условий тот же, что и в прежней построчной проверке
+    conditions = [
+        fact_start.isna() | (fact_start > today),
+        fact_end.notna() & (fact_end <= today),
+        (plan_end < today) & (fact_end.isna() | (fact_end > plan_end)),
+    ]
+    return np.select(conditions, [0, 2, 3], default=1)
+
+
+def bar_vertices(left, width, y, height):
+    """Вершины прямоугольников (n, 4, 2) для PolyCollection"""
+    x0, x1 = left, left + width
+    y0, y1 = y - height / 2, y + height / 2
+    return np.stack([
+        np.column_stack([x0, y0]), np.column_stack([x0, y1]),
+        np.column_stack([x1, y1]), np.column_stack([x1, y0]),
+    ], axis=1)
+
+
+def stage_label_formatter(stages):
+    """Подписи оси этапов: название для целых позиций, видимых при текущем масштабе"""
+    def label(y, pos):
+        row = int(round(y))
+        return str(stages[row]) if abs(y - row) < 1e-6 and 0 <= row < len(stages) else ""
+    return FuncFormatter(label)
+
+
+def plot_gantt(figure, df):
+    ax = figure.add_subplot(111)
+    ax.clear()
+
+    df = df.dropna(subset=["Дата начала", "Дата окончания", "Факт начала", "Факт окончания"])
+    if df.empty:
+        ax.text(0.5, 0.5, "Недостаточно данных для построения диаграммы", ha="center", va="center")
+        return None
+
+    stages = df["Этап"].to_numpy()
+    y_pos = np.arange(len(stages))
+
+    duration_plan = (df["Дата окончания"] - df["Дата начала"]).dt.days
+    duration_fact = (df["Факт окончания"] - df["Факт начала"]).dt.days
+    start_plan = df["Дата начала"]
+    start_fact = df["Факт начала"]
+
+    # Цвета прямоугольников
+    plan_color = "#2c3e50"  # темно-синий для плана
+    fact_color = "#1abc9c"  # зеленый для факта
+    # Цвета обводки по статусу
+    edge_colors = np.array(STATUS_COLORS)[gantt_statuses(df)]
+
+    if len(df) <= GANTT_BAR_LIMIT:
+        bars_plan = ax.barh(
+            y_pos - GANTT_BAR_OFFSET, duration_plan, height=GANTT_BAR_HEIGHT,
+            left=start_plan, color=plan_color, edgecolor=edge_colors, linewidth=3, label="План"
+        )
+        bars_fact = ax.barh(
+            y_pos + GANTT_BAR_OFFSET, duration_fact, height=GANTT_BAR_HEIGHT,
+            left=start_fact, color=fact_color, edgecolor=edge_colors, linewidth=3, label="Факт"
+        )
+        artists = list(bars_plan) + list(bars_fact)
+
+        # Настройки осей
+        ax.set_yticks(y_pos)
+        ax.set_yticklabels(stages)
+    else:
+        # Много этапов: план и факт — по одному PolyCollection вместо тысяч Rectangle,
+        # подписи этапов прореживаются локатором в зависимости от масштаба
+        bars_plan = PolyCollection(
+            bar_vertices(mdates.date2num(start_plan.to_numpy()), duration_plan.to_numpy(), y_pos - GANTT_BAR_OFFSET, GANTT_BAR_HEIGHT),
+            facecolors=plan_color, edgecolors=edge_colors, linewidths=0.5, label="План"
+        )
+        bars_fact = PolyCollection(
+            bar_vertices(mdates.date2num(start_fact.to_numpy()), duration_fact.to_numpy(), y_pos + GANTT_BAR_OFFSET, GANTT_BAR_HEIGHT),
+            facecolors=fact_color, edgecolors=edge_colors, linewidths=0.5, label="Факт"
+        )
+        ax.add_collection(bars_plan)
+        ax.add_collection(bars_fact)
+        artists = [bars_plan, bars_fact]
+
+        # Ось времени без единиц измерения (числа дней matplotlib): иначе при каждой
+        # перерисовке коллекция заново преобразует даты каждого прямоугольника
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.AutoDateFormatter(locator))
+        ax.set_ylim(-0.5, len(stages) - 0.5)
+        # Число подписей зависит от высоты оси и растёт при приближении
+        ax.yaxis.set_major_locator(MaxNLocator(nbins="auto", integer=True))
+        ax.yaxis.set_major_formatter(stage_label_formatter(stages))
+
+    ax.set_xlabel("Период")
+    ax.set_title("Гантт-диаграмма проекта")
+
+    min_date = min(df["Дата начала"].min(), df["Факт начала"].min())
+    max_date = max(df["Дата окончания"].max(), df["Факт окончания"].max())
+    if len(df) <= GANTT_BAR_LIMIT:
+        ax.set_xlim(min_date, max_date)
+    else:
+        ax.set_xlim(mdates.date2num(min_date), mdates.date2num(max_date))
+    figure.autofmt_xdate()
+
+    figure.subplots_adjust(bottom=0.2)
+    ax.grid(True, axis='x', linestyle='--', alpha=0.6)
+    # Добавим легенду по статусам
+    legend_elements = [
+        Patch(facecolor=color, edgecolor='black', label=label)
+        for label, color in zip(STATUS_LABELS, STATUS_COLORS)
+    ]
+    ax.legend(handles=legend_elements + list(ax.get_legend_handles_labels()[0]), loc='upper right')
+
+    return ax, artists, df, duration_plan, duration_fact
+
+
+def gantt_tooltips(df, duration_plan, duration_fact):
+    """Тексты подсказок для всех этапов диаграммы Гантта (по строкам df)"""
+    date = lambda col: df[col].dt.strftime("%d.%m.%Y")
+    return (
+        df["Этап"].astype(str)
+        + "\nПлан: " + date("Дата начала") + " – " + date("Дата окончания")
+        + " (" + duration_plan.astype(str) + " дн.)"
+        + "\nФакт: " + date("Факт начала") + " – " + date("Факт окончания")
+        + " (" + duration_fact.astype(str) + " дн.)"
+    ).to_numpy()
+
+
+class GanttHover:
+    """Всплывающие подсказки диаграммы Гантта.
+
+    Этап под курсором определяется арифметически: y — позиция этапа,
+    смещение от неё — план или факт, x сверяется с границами полосы.
+    Подсказка одна на диаграмму и перерисовывается поверх сохранённого
+    фона (blit), поэтому наведение не зависит от числа этапов.
+    """
+
+    def __init__(self, ax, df, tooltips):
+        self.ax = ax
+        self.tooltips = tooltips
+        plan_left = mdates.date2num(df["Дата начала"].to_numpy())
+        fact_left = mdates.date2num(df["Факт начала"].to_numpy())
+        self.bars = {
+            -1: (plan_left, plan_left + (df["Дата окончания"] - df["Дата начала"]).dt.days.to_numpy()),
+            1: (fact_left, fact_left + (df["Факт окончания"] - df["Факт начала"]).dt.days.to_numpy()),
+        }
+        self.annotation = ax.annotate(
+            "", xy=(0, 0), xytext=(15, 15), textcoords="offset points",
+            bbox=dict(boxstyle="round", fc="white", alpha=0.9),
+            arrowprops=dict(arrowstyle="simple", facecolor="black"),
+            animated=True, visible=False
+        )
+        self.background = None
+        self.current = None
+        canvas = ax.figure.canvas
+        self.cids = [
+            canvas.mpl_connect("draw_event", self.on_draw),
+            canvas.mpl_connect("motion_notify_event", self.on_move),
+            canvas.mpl_connect("axes_leave_event", self.on_leave),
+        ]
+
+    def bar_at(self, x, y):
+        """(позиция этапа, -1 план / 1 факт) под точкой или None"""
+        row = int(round(y))
+        if not 0 <= row < len(self.tooltips):
+            return None
+        offset = y - row
+        half = GANTT_BAR_HEIGHT / 2
+        for side, (left, right) in self.bars.items():
+            if abs(offset - side * GANTT_BAR_OFFSET) <= half and left[row] <= x <= right[row]:
+                return row, side
+        return None
+
+    def on_move(self, event):
+        if event.inaxes is not self.ax or event.xdata is None:
+            bar = None
+        else:
+            bar = self.bar_at(event.xdata, event.ydata)
+        if bar == self.current:
+            return
+        self.current = bar
+        if bar is not None:
+            row, side = bar
+            left, right = self.bars[side]
+            self.annotation.xy = ((left[row] + right[row]) / 2, row + side * GANTT_BAR_OFFSET)
+            self.annotation.set_text(self.tooltips[row])
+        self.annotation.set_visible(bar is not None)
+        self.blit()
+
+    def on_leave(self, event):
+        if self.current is not None:
+            self.current = None
+            self.annotation.set_visible(False)
+            self.blit()
+
+    def on_draw(self, event):
+        canvas = self.ax.figure.canvas
+        self.background = canvas.copy_from_bbox(self.ax.figure.bbox)
+        if self.annotation.get_visible():
+            self.ax.draw_artist(self.annotation)
+
+    def blit(self):
+        canvas = self.ax.figure.canvas
+        if self.background is None:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self.background)
+        if self.annotation.get_visible():
+            self.ax.draw_artist(self.annotation)
+        canvas.blit(self.ax.figure.bbox)
+
+    def disconnect(self):
+        canvas = self.ax.figure.canvas
+        for cid in self.cids:
+            canvas.mpl_disconnect(cid)
+        self.cids = []
+
+
+def top_positions(values, n):
+    """Позиции n крупнейших значений в исходном порядке и маска остальных"""
+    # NaN при сортировке оказываются последними и попадают в остальные
+    top = np.sort(np.argsort(-values, kind="stable")[:n])
+    rest = np.ones(len(values), dtype=bool)
+    rest[top] = False
+    return top, rest
+
+
+def top_n_with_other(labels, values, n):
+    """Крупнейшие n значений в исходном порядке и сумма остальных под меткой «Прочее»"""
+    labels = np.asarray(labels, dtype=object)
+    values = np.asarray(values, dtype="float64")
+    if len(values) <= n:
+        return labels, values
+    top, rest = top_positions(values, n)
+    return (
+        np.append(labels[top], f"{OTHER_LABEL} ({rest.sum()} эт.)"),
+        np.append(values[top], np.nansum(values[rest]))
+    )
+
+
+def bucket_ranges(count, max_points):
+    """Начала групп подряд идущих позиций, чтобы групп было не больше max_points"""
+    size = max(1, int(np.ceil(count / max_points)))
+    return np.arange(0, count, size), size
+
+
+class LodLayer:
+    """Уровень детализации графика по видимому диапазону оси X.
+
+    draw(lo, hi) рисует данные диапазона (агрегированные или подробные)
+    и возвращает созданные artists; при изменении пределов оси (приближение,
+    сдвиг) они удаляются и строятся заново, поэтому объём отрисовки
+    ограничен бюджетом точек при любом размере проекта.
+    """
+
+    def __init__(self, ax, draw, lo, hi):
+        self.ax = ax
+        self.draw = draw
+        self.artists = []
+        self.limits = (lo, hi)
+        ax.set_xlim(lo, hi)
+        self.update(lo, hi)
+        # Обработчики осей хранятся по слабой ссылке — слой живёт вместе с осями
+        ax.lod_layer = self
+        ax.callbacks.connect("xlim_changed", self.on_xlim_changed)
+
+    def update(self, lo, hi):
+        for artist in self.artists:
+            artist.remove()
+        self.artists = self.draw(lo, hi)
+        self.ax.relim()
+        self.ax.autoscale_view(scalex=False)
+
+    def on_xlim_changed(self, ax):
+        limits = ax.get_xlim()
+        if limits != self.limits:
+            self.limits = limits
+            self.update(*limits)
+
+
+def plot_budget_comparison(figure, df, max_points=LOD_MAX_POINTS):
+    ax = figure.add_subplot(111)
+    width = 0.35
+    labels, plan = df["Этап"].to_numpy(), df["План. бюджет"].to_numpy(dtype="float64")
+    fact = df["Факт. бюджет"].to_numpy(dtype="float64")
+    title = "Сравнение бюджета (план vs факт)"
+    if len(df) > max_points:
+        # Крупнейшие этапы по плановому бюджету, остальные — одним столбцом «Прочее»
+        labels, plan_top = top_n_with_other(labels, plan, max_points - 1)
+        top, rest = top_positions(plan, max_points - 1)
+        plan, fact = plan_top, np.append(fact[top], np.nansum(fact[rest]))
+        title += f": {max_points - 1} крупнейших этапов из {len(df)}"
+    indices = np.arange(len(labels))
+
+    ax.bar(indices, plan, width, label="План", color="#2c3e50")
+    ax.bar(indices + width, fact, width, label="Факт", color="#1abc9c")
+
+    ax.set_title(title)
+    ax.set_ylabel("Бюджет, руб.")
+    ax.set_xticks(indices + width / 2)
+    ax.set_xticklabels(labels, rotation=45)
+    ax.legend()
+
+
+def plot_resource_distribution(figure, df, max_wedges=LOD_MAX_WEDGES):
+    ax = figure.add_subplot(111)
+    # Больше max_wedges секторов не читаются: мелкие этапы объединяются в «Прочее»
+    labels, sizes = top_n_with_other(df["Этап"], df["Ресурсы"], max_wedges)
+    ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=matplotlib.colormaps["Paired"].colors)
+    ax.axis('equal')
+    ax.set_title("Распределение ресурсов")
+
+
+def deviation_colors(values):
+    """Цвет и тип отклонения по знаку: задержка, опережение, в срок"""
+    kind = np.sign(values).astype(int)
+    colors = np.array(["#66bb6a", "#b0bec5", "#ef5350"])[kind + 1]
+    labels = np.array(["Опережение", "В срок", "Задержка"])[kind + 1]
+    return colors, labels
+
+
+def draw_deviation_points(ax, x, values):
+    """Точки отклонений с подписями (подробный режим); возвращает artists"""
+    colors, labels = deviation_colors(values)
+    artists = [
+        # Точки с цветовой индикацией
+        ax.scatter(x, values, color=colors, s=80, zorder=3),
+    ]
+    # Линия для наглядности
+    artists += ax.plot(x, values, color="#e67e22", alpha=0.5, zorder=2)
+
+    # Подписи над точками
+    for xv, y, label, color in zip(x, values, labels, colors):
+        if y > 0:
+            txt = f"+{y:g} дн. ({label})"
+        elif y < 0:
+            txt = f"{y:g} дн. ({label})"
+        else:
+            txt = f"0 дн. (В срок)"
+        artists.append(ax.annotate(txt, (xv, y), textcoords="offset points", xytext=(0, 8), ha='center', fontsize=10, color=color))
+    return artists
+
+
+def draw_deviation_buckets(ax, x, values, max_points):
+    """Среднее и размах отклонений по группам подряд идущих этапов; возвращает artists"""
+    starts, size = bucket_ranges(len(values), max_points)
+    counts = np.diff(np.append(starts, len(values)))
+    mean = np.add.reduceat(values, starts) / counts
+    low, high = np.minimum.reduceat(values, starts), np.maximum.reduceat(values, starts)
+    centers = x[starts] + (counts - 1) / 2
+    colors, _ = deviation_colors(mean)
+    artists = [ax.fill_between(centers, low, high, color="#e67e22", alpha=0.15, zorder=1)]
+    artists += ax.plot(centers, mean, color="#e67e22", alpha=0.5, zorder=2)
+    artists.append(ax.scatter(centers, mean, color=colors, s=20, zorder=3))
+    return artists
+
+
+def plot_time_deviation(figure, df, max_points=LOD_MAX_POINTS):
+    ax = figure.add_subplot(111)
+
+    df = df.dropna(subset=["Дата начала", "Дата окончания", "Факт начала", "Факт окончания"])
+    if df.empty:
+        ax.text(0.5, 0.5, "Недостаточно данных для построения графика", ha="center", va="center")
+        return
+
+    values = df["∆T_days"].to_numpy(dtype="float64")
+    if len(df) <= max_points:
+        draw_deviation_points(ax, df["Этап"].astype(str).to_numpy(), values)
+        ax.tick_params(axis='x', labelrotation=45)
+    else:
+        # Много этапов: по оси X — позиции этапов; вне приближения показываются
+        # среднее и размах по группам, при приближении — отдельные этапы
+        stages = df["Этап"].to_numpy()
+        positions = np.arange(len(df), dtype="float64")
+
+        def draw(lo, hi):
+            first, last = max(int(np.ceil(lo)), 0), min(int(np.floor(hi)) + 1, len(values))
+            if last - first <= 0:
+                return []
+            if last - first <= max_points:
+                return draw_deviation_points(ax, positions[first:last], values[first:last])
+            return draw_deviation_buckets(ax, positions[first:last], values[first:last], max_points)
+
+        LodLayer(ax, draw, -0.5, len(df) - 0.5)
+        ax.xaxis.set_major_locator(MaxNLocator(nbins="auto", integer=True))
+        ax.xaxis.set_major_formatter(stage_label_formatter(stages))
+        ax.tick_params(axis='x', labelrotation=45)
+
+    ax.set_title("Отклонения по времени по этапам проекта")
+    ax.set_ylabel("Отклонение, дни")
+    ax.axhline(0, color='gray', linestyle='--')
+    ax.grid(axis='y', linestyle=':', alpha=0.5)
+
+    # Легенда
+    from matplotlib.lines import Line2D
+    legend_elements = [
+        Line2D([0], [0], marker='o', color='w', label='Задержка', markerfacecolor='#ef5350', markersize=10),
+        Line2D([0], [0], marker='o', color='w', label='Опережение', markerfacecolor='#66bb6a', markersize=10),
+        Line2D([0], [0], marker='o', color='w', label='В срок', markerfacecolor='#b0bec5', markersize=10),
+    ]
+    ax.legend(handles=legend_elements, loc='upper right')
+
+
+def plot_execution_time(figure, df):
+    ax = figure.add_subplot(111)
+
+    df = df.dropna(subset=["Дата начала", "Дата окончания", "Факт начала", "Факт окончания"])
+    if df.empty:
+        ax.text(0.5, 0.5, "Недостаточно данных для построения графика", ha="center", va="center")
+        return
+
+    df["Время выполнения"] = (df["Факт окончания"] - df["Факт начала"]).dt.total_seconds() / 3600  # Часы
+    df["Плановое время"] = (df["Дата окончания"] - df["Дата начала"]).dt.total_seconds() / 3600  # Часы
+
+    x = df["Этап"]
+    y1 = df["Плановое время"]
+    y2 = df["Время выполнения"]
+
+    width = 0.35
+    ax.bar(x, y1, width, label="Плановое время", color="#2c3e50")
+    ax.bar(x, y2, width, label="Фактическое время", color="#1abc9c", bottom=y1)
+
+    ax.set_title("Время выполнения этапов")
+    ax.set_ylabel("Время, часы")
+    ax.legend()
+
+
+def plot_time_metrics(figure, df):
+    ax = figure.add_subplot(111)
+    ax.clear()
+    required_cols = ["Этап"]
+    for col in required_cols:
+        if col not in df.columns:
+            ax.text(0.5, 0.5, f"Нет данных: {col}", ha="center", va="center")
+            return
+    # Нормативы из базы знаний сопоставляются этапам проекта по названию;
+    # база читается один раз и перечитывается только после изменения файла
+    metrics = knowledge_base.join_time_metrics(df["Этап"])
+    norm = metrics[knowledge_base.NORM_COLUMN].to_numpy()
+    fact = metrics[knowledge_base.FACT_COLUMN].to_numpy()
+    # Календарная длительность — если есть даты, иначе пропуск
+    if "Дата начала" in df.columns and "Факт окончания" in df.columns:
+        cal = (df["Факт окончания"] - df["Дата начала"]).dt.days
+    elif "Дата начала" in df.columns and "Дата окончания" in df.columns:
+        cal = (df["Дата окончания"] - df["Дата начала"]).dt.days
+    else:
+        cal = np.full(len(df), np.nan)
+    x = df["Этап"]
+    bar_width = 0.25
+    indices = np.arange(len(x))
+    ax.bar(indices - bar_width, norm, width=bar_width, color="#3CB371", label="Нормативное время выполнения")
+    ax.bar(indices, fact, width=bar_width, color="#90EE90", label="Фактическая трудоемкость")
+    ax.bar(indices + bar_width, cal, width=bar_width, color="#FF6347", label="Календарная длительность")
+    ax.set_xticks(indices)
+    ax.set_xticklabels(x, rotation=30, ha="right")
+    ax.set_ylabel("Время, дни")
+    ax.set_title("Время выполнения бизнес-процесса, дни")
+    ax.legend()
+    ax.grid(axis="y", linestyle=":", alpha=0.5)
+    figure.subplots_adjust(bottom=0.3)
+
+
+def draw_budget_lines(ax, x, y_plan, y_fact, annotate=True):
+    """Линии планового и фактического бюджета с заливкой между ними; возвращает artists"""
+    marker = "o" if annotate else None
+    artists = ax.plot(x, y_plan, marker=marker, label="Плановый бюджет", color="#2c3e50", linewidth=2)
+    artists += ax.plot(x, y_fact, marker=marker, label="Фактический бюджет", color="#e74c3c", linewidth=2)
+    artists.append(ax.fill_between(x, y_plan, y_fact, where=(y_fact > y_plan), color="#ffcccc", alpha=0.5, label="Перерасход"))
+    artists.append(ax.fill_between(x, y_plan, y_fact, where=(y_fact < y_plan), color="#c8e6c9", alpha=0.5, label="Экономия"))
+
+    if annotate:
+        # Подписи значений на точках
+        for xv, yp, yf in zip(x, y_plan, y_fact):
+            artists.append(ax.annotate(f"{int(yp)}", (xv, yp), textcoords="offset points", xytext=(0,8), ha='center', fontsize=9, color="#2c3e50"))
+            artists.append(ax.annotate(f"{int(yf)}", (xv, yf), textcoords="offset points", xytext=(0,-12), ha='center', fontsize=9, color="#e74c3c"))
+    return artists
+
+
+def draw_budget_buckets(ax, x, y_plan, y_fact, lo, hi, max_points):
+    """Суммы бюджета по равным периодам видимого диапазона дат; возвращает artists"""
+    width = (hi - lo) / max_points
+    bucket = np.minimum(((x - lo) // width).astype(int), max_points - 1)
+    count = np.bincount(bucket, minlength=max_points)
+    plan = np.bincount(bucket, weights=np.nan_to_num(y_plan), minlength=max_points)
+    fact = np.bincount(bucket, weights=np.nan_to_num(y_fact), minlength=max_points)
+    used = count > 0
+    centers = lo + (np.nonzero(used)[0] + 0.5) * width
+    return draw_budget_lines(ax, centers, plan[used], fact[used], annotate=False)
+
+
+def plot_budget_dynamics(figure, df, max_points=LOD_MAX_POINTS):
+    ax = figure.add_subplot(111)
+    # Сортировка по дате окончания этапа (или по этапу, если дат нет)
+    if "Дата окончания" in df.columns:
+        df_sorted = df.sort_values("Дата окончания")
+        x = df_sorted["Дата окончания"]
+        x_label = "Дата окончания этапа"
+    else:
+        df_sorted = df.copy()
+        x = df_sorted["Этап"]
+        x_label = "Этап"
+    y_plan = df_sorted["План. бюджет"]
+    y_fact = df_sorted["Факт. бюджет"]
+
+    # Проверка на NaN
+    if y_plan.isnull().all() or y_fact.isnull().all():
+        ax.text(0.5, 0.5, "Нет данных для построения графика", ha="center", va="center")
+        return
+
+    title = "Динамика бюджета во времени"
+    if len(df_sorted) <= max_points or x_label == "Этап":
+        # Построение графика с маркерами, цветами и заливкой между линиями
+        draw_budget_lines(ax, x, y_plan, y_fact)
+        ax.set_title(title)
+        setp(ax.get_xticklabels(), rotation=30, ha="right")
+    else:
+        # Много этапов: вне приближения — суммы по периодам, при приближении — этапы.
+        # Ось дат без единиц измерения, как и у крупной диаграммы Гантта
+        dates = mdates.date2num(x.to_numpy())
+        valid = ~np.isnan(dates)
+        if not valid.any():
+            ax.text(0.5, 0.5, "Нет данных для построения графика", ha="center", va="center")
+            return
+        dates = dates[valid]
+        plan = y_plan.to_numpy(dtype="float64")[valid]
+        fact = y_fact.to_numpy(dtype="float64")[valid]
+
+        def draw(lo, hi):
+            visible = (dates >= lo) & (dates <= hi)
+            if visible.sum() <= max_points:
+                ax.set_title(title)
+                return draw_budget_lines(ax, dates[visible], plan[visible], fact[visible])
+            ax.set_title(f"{title} (суммы по периодам)")
+            return draw_budget_buckets(ax, dates[visible], plan[visible], fact[visible], lo, hi, max_points)
+
+        pad = max((dates.max() - dates.min()) * 0.02, 1)
+        LodLayer(ax, draw, dates.min() - pad, dates.max() + pad)
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.AutoDateFormatter(locator))
+        # Поворот задаётся параметрами оси: подписи создаются заново при приближении
+        ax.tick_params(axis='x', labelrotation=30)
+
+    ax.set_xlabel(x_label)
+    ax.set_ylabel("Бюджет, руб.")
+    ax.legend(loc="upper left")
+    ax.grid(True, linestyle=":", alpha=0.5)
+
+
+PLOTTERS = {
+    "Гантт": plot_gantt,
+    "Затраты": plot_budget_comparison,
+    "Ресурсы": plot_resource_distribution,
+    "Отклонения": plot_time_deviation,
+    "Время выполнения": plot_time_metrics,
+    "Динамика бюджета": plot_budget_dynamics,
+}
+
+
+def chart_source(chart_type):
+    """Версия внешних данных графика: график времени зависит ещё и от файла базы знаний"""
+    return knowledge_base.source_mtime() if chart_type == "Время выполнения" else None
+
+
+def render_chart(chart_type, df, fmt="png", figsize=(10, 5), dpi=100):
+    """Строит график на внеэкранной фигуре Agg и возвращает файл изображения в байтах"""
+    figure = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(figure)
+    PLOTTERS[chart_type](figure, df)
+    figure.tight_layout()
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=fmt, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def available_cpus():
+    """Число процессоров, доступных процессу (с учётом привязки к ядрам)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def get_executor():
+    """Общий пул процессов экспорта.
+
+    Процессы запускаются через spawn: fork процесса с запущенным Qt небезопасен.
+    """
+    global _executor
+    if _executor is None:
+        workers = min(len(EXPORT_CHARTS), available_cpus())
+        _executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+@tracing.traced("Экспорт графиков")
+def export_charts(df, chart_types=EXPORT_CHARTS, fmt="png", parallel=True):
+    """Строит графики вне экрана и возвращает [(тип графика, BytesIO)].
+
+    fmt — "png" или "svg". При parallel графики строятся одновременно
+    в пуле процессов; если пул недоступен, они строятся в текущем процессе.
+    """
+    df = df[[col for col in CHART_COLUMNS if col in df.columns]]
+    images = None
+    if parallel and available_cpus() > 1 and len(chart_types) > 1:
+        try:
+            executor = get_executor()
+            futures = [executor.submit(render_chart, chart_type, df, fmt) for chart_type in chart_types]
+            images = [future.result() for future in futures]
+        except Exception as e:
+            # Графики строятся в текущем процессе; причина видна на странице производительности
+            tracing.annotate(pool_error=f"{type(e).__name__}: {e}")
+            shutdown_executor()
+    if images is None:
+        images = [render_chart(chart_type, df, fmt) for chart_type in chart_types]
+    return [(chart_type, io.BytesIO(image)) for chart_type, image in zip(chart_types, images)]
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+
+def format_value(value):
+    """Форматирование значения ячейки по умолчанию"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, (float, np.floating)):
+        return str(int(value)) if float(value).is_integer() else f"{value:.2f}"
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).strftime("%d.%m.%Y")
+    return str(value)
+
+
+def format_number(value):
+    """Число с двумя знаками после запятой"""
+    if pd.isna(value):
+        return ""
+    return f"{value:.2f}"
+
+
+def format_percent(value):
+    """Процентное значение метрики, например «12.50 %»"""
+    if pd.isna(value):
+        return ""
+    return f"{value:.2f} %"
+
+
+# Отображение рассчитанных метрик; в данных они хранятся как float64
+METRIC_FORMATTERS = {"ΔT": format_percent, "ΔC": format_percent, "E": format_number}
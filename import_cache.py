@@ -0,0 +1,129 @@
+import hashlib
+import os
+import pandas as pd
+from view.project_io import REQUIRED_COLUMNS, TEXT_COLUMNS, DATE_COLUMNS, NUMERIC_COLUMNS
+
+try:
+    import pyarrow  # noqa: F401 — движок Parquet для pandas
+except ImportError:
+    pyarrow = None
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".expsystem", "import_cache")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Объём начала и конца файла, входящий в ключ кэша
+SAMPLE_BYTES = 64 * 1024
+
+# Версия формата записей; увеличивается при изменении того, что сохраняется в кэш
+CACHE_FORMAT_VERSION = 1
+
+# Схема импорта входит в ключ: после изменения типов столбцов прежние записи не читаются
+SCHEMA_SIGNATURE = repr((
+    CACHE_FORMAT_VERSION, REQUIRED_COLUMNS, sorted(TEXT_COLUMNS.items()), DATE_COLUMNS, NUMERIC_COLUMNS
+)).encode("utf-8")
+
+
+class ImportCache:
+    """Кэш импортированных проектов в формате Parquet с вытеснением LRU.
+
+    Ключ — версия схемы импорта, путь, размер, время изменения и хэш
+    начала/конца файла.
+    Давность использования записи хранится во времени изменения файла кэша.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self):
+        return pyarrow is not None
+
+    def key(self, file_path):
+        stat = os.stat(file_path)
+        digest = hashlib.sha1(SCHEMA_SIGNATURE)
+        digest.update(os.path.abspath(file_path).encode("utf-8"))
+        digest.update(f"|{stat.st_size}|{stat.st_mtime_ns}|".encode("ascii"))
+        with open(file_path, "rb") as f:
+            digest.update(f.read(SAMPLE_BYTES))
+            if stat.st_size > SAMPLE_BYTES:
+                f.seek(max(stat.st_size - SAMPLE_BYTES, SAMPLE_BYTES))
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def load(self, file_path):
+        """Возвращает DataFrame из кэша или None"""
+        if not self.enabled:
+            return None
+        path = self.entry_path(self.key(file_path))
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_parquet(path)
+        except Exception:
+            # Повреждённая запись — удаляем и читаем исходный файл
+            self.remove(path)
+            return None
+        try:
+            os.utime(path)  # отметка использования для LRU
+        except OSError:
+            pass  # запись только для чтения или уже вытеснена — данные прочитаны
+        return df
+
+    def store(self, file_path, df):
+        """Сохраняет DataFrame в кэш и вытесняет давно неиспользуемые записи"""
+        if not self.enabled:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.entry_path(self.key(file_path))
+        tmp_path = path + ".tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self):
+        """Записи кэша (путь, размер, время использования)"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        result = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".parquet"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            result.append((path, stat.st_size, stat.st_mtime))
+        return result
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total -= size
+
+    def clear(self):
+        """Удаляет все записи, возвращает освобождённый объём в байтах"""
+        freed = 0
+        for path, size, _ in self.entries():
+            self.remove(path)
+            freed += size
+        return freed
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
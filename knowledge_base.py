@@ -0,0 +1,93 @@
+import json
+import os
+import warnings
+import numpy as np
+import pandas as pd
+
+
+# База знаний по времени — рядом с модулем, как и база правил рекомендаций
+DEFAULT_TIME_KB_PATH = os.path.join(os.path.dirname(__file__), "knowledge_base_time.json")
+
+# Прежнее расположение: база читалась страницей анализа, рядом с view/pages
+LEGACY_TIME_KB_PATH = os.path.join(os.path.dirname(__file__), "pages", "knowledge_base_time.json")
+
+NORM_COLUMN = "Нормативное время выполнения (дни)"
+FACT_COLUMN = "Фактическая трудоемкость (дни)"
+TIME_COLUMNS = [NORM_COLUMN, FACT_COLUMN]
+
+# Поля записей файла -> столбцы таблицы
+TIME_FIELDS = {"stage": "Этап", "norm": NORM_COLUMN, "fact": FACT_COLUMN}
+
+# Прочитанные базы: путь -> (время изменения файла, таблица)
+_time_cache = {}
+
+
+def time_kb_path():
+    """Путь базы знаний по времени; если рядом с модулем её нет — прежнее расположение"""
+    if os.path.exists(DEFAULT_TIME_KB_PATH) or not os.path.exists(LEGACY_TIME_KB_PATH):
+        return DEFAULT_TIME_KB_PATH
+    warnings.warn(
+        f"База знаний по времени прочитана из прежнего каталога {LEGACY_TIME_KB_PATH}; "
+        f"перенесите её в {DEFAULT_TIME_KB_PATH}",
+        stacklevel=3
+    )
+    return LEGACY_TIME_KB_PATH
+
+
+def source_mtime(path=None):
+    """Время изменения файла базы знаний или None, если файла нет"""
+    path = path or time_kb_path()
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def empty_time_table():
+    return pd.DataFrame(
+        {col: pd.Series(dtype="float64") for col in TIME_COLUMNS},
+        index=pd.Index([], dtype=object, name="Этап")
+    )
+
+
+def read_time_table(path):
+    """Читает базу знаний в таблицу нормативов с индексом по названию этапа"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    df = pd.DataFrame(data).rename(columns=TIME_FIELDS)
+    if "Этап" not in df.columns:
+        return empty_time_table()
+    for col in TIME_COLUMNS:
+        values = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+        df[col] = pd.to_numeric(values, errors="coerce").astype("float64")
+    df["Этап"] = df["Этап"].astype(str)
+    # Индекс должен быть уникальным: при повторах действует последняя запись
+    return df.drop_duplicates("Этап", keep="last").set_index("Этап")[TIME_COLUMNS]
+
+
+def load_time_knowledge_base(path=None):
+    """Таблица нормативов времени; файл перечитывается только после его изменения"""
+    path = path or time_kb_path()
+    mtime = source_mtime(path)
+    if mtime is None:
+        return empty_time_table()
+    cached = _time_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    table = read_time_table(path)
+    _time_cache[path] = (mtime, table)
+    return table
+
+
+def join_time_metrics(stages, table=None):
+    """Нормативы базы знаний для этапов проекта в их порядке.
+
+    Этапы сопоставляются по названию через хэш-индекс таблицы;
+    для этапов, которых нет в базе, значения — NaN.
+    """
+    table = load_time_knowledge_base() if table is None else table
+    positions = table.index.get_indexer(pd.Index(stages).astype(str))
+    values = np.full((len(positions), len(TIME_COLUMNS)), np.nan)
+    found = positions >= 0
+    values[found] = table.to_numpy(dtype="float64")[positions[found]]
+    return pd.DataFrame(values, columns=TIME_COLUMNS)
@@ -8,6 +8,10 @@ from view.pages.analysis_page import AnalysisPage
 from view.pages.recommendations_page import RecommendationsPage
 from view.pages.reports_page import ReportsPage
 from view.pages.calculations_page import CalculationsPage
+from view.pages.performance_page import PerformancePage
+from view.pages.portfolio_page import PortfolioPage
+from view.project_dataset import ProjectDataset
+from view import tracing
 from PyQt5.QtWidgets import QDesktopWidget
 
 class MainWindow(QMainWindow):
@@ -15,6 +19,7 @@ class MainWindow(QMainWindow):
         super().__init__()
 
         self.project_data = None
+        self.dataset = None  # общий нормализованный набор данных для страниц
 
         # Установка заголовка
         self.setWindowTitle("Анализ проектов")
@@ -86,7 +91,7 @@ class MainWindow(QMainWindow):
 
         self.buttons = []
 
-        for name in ["Проект", "Анализ", "Рекомендации", "Отчёты", "Рассчитанные значения"]:
+        for name in ["Проект", "Портфель", "Анализ", "Рекомендации", "Отчёты", "Рассчитанные значения", "Производительность"]:
             btn = QPushButton(name)
             btn.setObjectName("menuButton")
             btn.setCheckable(True)
@@ -102,10 +107,12 @@ class MainWindow(QMainWindow):
         # Добавление страниц
         self.pages = {
             "Проект": ProjectPage(),
+            "Портфель": PortfolioPage(),
             "Анализ": AnalysisPage(),
             "Рекомендации": RecommendationsPage(),
             "Отчёты": ReportsPage(),
             "Рассчитанные значения": CalculationsPage(),
+            "Производительность": PerformancePage(),
         }
 
         for page in self.pages.values():
@@ -123,29 +130,62 @@ class MainWindow(QMainWindow):
             btn.setChecked(btn.text() == page_name)
         self.content_area.setCurrentWidget(self.pages[page_name])
 
-        # Если открываем "Рекомендации" — передаём актуальные расчеты
-        if page_name == "Рекомендации":
-            calc_page = self.pages.get("Рассчитанные значения")
-            rec_page = self.pages.get("Рекомендации")
+        # Страница пересчитывается только при первом показе после изменения данных
+        self.refresh_page(self.pages[page_name])
 
-            if calc_page and hasattr(calc_page, "calculations_data") and rec_page and hasattr(rec_page,
-                                                                                              "set_calculations"):
-                if calc_page.calculations_data is not None:
-                    rec_page.set_calculations(calc_page.calculations_data)
+    def refresh_page(self, page):
+        """Передаёт странице актуальный набор данных.
+
+        Страницы с set_data — ленивые потребители: уже обработанную версию
+        набора данных они пропускают, поэтому повторный вызов ничего не стоит.
+        """
+        if hasattr(page, "set_data"):
+            page.set_data(self.dataset)
+        return page
 
     def set_project_data(self, data):
         self.project_data = data
-        for page in self.pages.values():
-            if hasattr(page, "set_data"):
-                page.set_data(data)
-
-        # Передача рассчитанных значений во вкладку "Рекомендации"
-        calc_page = self.pages.get("Рассчитанные значения")
-        if calc_page and hasattr(calc_page, "calculations_data") and calc_page.calculations_data is not None:
-            rec_page = self.pages.get("Рекомендации")
-            if rec_page and hasattr(rec_page, "set_calculations"):
-                rec_page.set_calculations(calc_page.calculations_data)
-
+        # Даты и производные столбцы рассчитываются один раз для всех страниц
+        with tracing.span("Подготовка данных", rows=len(data) if data is not None else 0):
+            self.dataset = ProjectDataset(data) if data is not None else None
+        # Остальные страницы получат данные при показе
+        self.refresh_page(self.content_area.currentWidget())
+
+
+    def apply_project_changes(self, updated=None, inserted=None, deleted=None):
+        """Применяет изменения части этапов без полного пересчёта.
+
+        updated — DataFrame изменённых этапов (индекс — метки этапов),
+        inserted — DataFrame новых этапов, deleted — метки удаляемых этапов.
+        """
+        if self.dataset is None:
+            return
+        previous = self.dataset.version
+        with tracing.span(
+            "Изменение этапов",
+            updated=len(updated) if updated is not None else 0,
+            inserted=len(inserted) if inserted is not None else 0,
+            deleted=len(deleted) if deleted is not None else 0
+        ):
+            changes = self.dataset.apply_changes(updated=updated, inserted=inserted, deleted=deleted)
+            self.project_data = self.dataset.raw
+            for page in self.pages.values():
+                # Изменения применимы только к странице, обработавшей предыдущую версию;
+                # остальные страницы пересчитаются целиком при показе
+                if hasattr(page, "apply_changes") and getattr(page, "data_version", previous) == previous:
+                    with tracing.span("Обновление страницы", page=type(page).__name__):
+                        page.apply_changes(self.dataset, changes)
+        self.refresh_page(self.content_area.currentWidget())
+
+    def open_portfolio_project(self, portfolio, name):
+        """Открывает проект портфеля на страницах одного проекта"""
+        data = portfolio.project(name)
+        self.pages["Проект"].show_project(data, f"Проект портфеля «{name}»: этапов {len(data)}")
+        self.set_project_data(data)
+        self.switch_page("Проект")
 
     def get_project_data(self):
         return self.project_data
+
+    def get_dataset(self):
+        return self.dataset
@@ -0,0 +1,315 @@
+import functools
+import itertools
+import os
+import zlib
+import matplotlib
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfdoc import PDFDictionary, PDFName, PDFStream
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Image
+from view import charts
+from view.report_builder import (
+    METRIC_COLUMNS, REPORT_FIELDS, ReportProgress, chart_images, metric_columns, project_columns
+)
+
+
+# Размеры в пунктах (1/72 дюйма)
+PAGE_SIZE = A4
+MARGIN = 40
+
+# Шрифт с кириллицей — DejaVu Sans из поставки matplotlib, те же метрики, что и на графиках
+FONT_DIR = os.path.join(matplotlib.get_data_path(), "fonts", "ttf")
+FONT = "DejaVuSans"
+BOLD_FONT = "DejaVuSans-Bold"
+
+FONT_SIZE = 7
+LEADING = 10          # шаг строк текста таблицы
+BASELINE = 7.5        # от верхней границы строки таблицы до базовой линии текста
+HEADING_SIZES = {0: 16, 1: 12}
+CELL_PADDING = 3
+MIN_COLUMN_WIDTH = 36
+SAMPLE_ROWS = 1000    # строк, по которым оцениваются ширины столбцов
+GRID_COLOR = (0.5, 0.5, 0.5)
+
+# Зарегистрированные шрифты: путь к файлу -> имя в ReportLab
+_fonts = {}
+
+
+def register_font(path, name=None):
+    if path not in _fonts:
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        pdfmetrics.registerFont(TTFont(name, path))
+        _fonts[path] = name
+    return _fonts[path]
+
+
+def register_fonts():
+    register_font(os.path.join(FONT_DIR, "DejaVuSans.ttf"), FONT)
+    register_font(os.path.join(FONT_DIR, "DejaVuSans-Bold.ttf"), BOLD_FONT)
+
+
+class CompressedPageCanvas(Canvas):
+    """Холст ReportLab, сжимающий содержимое страницы сразу при её завершении.
+
+    ReportLab хранит текст всех страниц до save(); в сжатом виде страницы
+    отчёта на тысячи страниц занимают в памяти в десятки раз меньше.
+    """
+
+    def showPage(self):
+        super().showPage()
+        page = self._doc.Pages.pages[-1]
+        # Поток с заданным Filter ReportLab не кодирует повторно
+        page.Contents = PDFStream(
+            PDFDictionary({"Filter": PDFName("FlateDecode")}),
+            zlib.compress(page.stream.encode("utf-8"))
+        )
+        page.stream = None
+
+
+@functools.lru_cache(maxsize=16384)
+def wrap_cell(text, font, width):
+    """Строки текста ячейки; тексты рекомендаций повторяются и переносятся один раз"""
+    if "\n" not in text and stringWidth(text, font, FONT_SIZE) <= width:
+        return (text,)
+    return tuple(simpleSplit(text, font, FONT_SIZE, width)) or ("",)
+
+
+def column_widths(headers, sample, total_width):
+    """Ширины столбцов пропорционально длине заголовков и типичных значений"""
+    weights = []
+    for j, header in enumerate(headers):
+        lengths = sorted(len(row[j]) for row in sample) if sample else [0]
+        typical = lengths[int(len(lengths) * 0.9)]
+        # Заголовок переносится по словам, но самое длинное слово должно поместиться
+        longest_word = max((len(word) for word in header.split()), default=0)
+        weights.append(max(longest_word * 1.2, typical, 4))
+    widths = [total_width * weight / sum(weights) for weight in weights]
+    # Узкие столбцы расширяются за счёт остальных
+    narrow = [w < MIN_COLUMN_WIDTH for w in widths]
+    if any(narrow) and not all(narrow):
+        rest = total_width - MIN_COLUMN_WIDTH * sum(narrow)
+        wide = sum(w for w, n in zip(widths, narrow) if not n)
+        widths = [MIN_COLUMN_WIDTH if n else w * rest / wide for w, n in zip(widths, narrow)]
+    return widths
+
+
+class PdfReportWriter:
+    """Постраничная запись отчёта в PDF.
+
+    Таблицы выводятся по мере чтения строк: в памяти находится только
+    текущая страница, готовые страницы сразу сжимаются холстом. Графики —
+    те же PNG, что и в отчёте Word, на отдельных альбомных страницах.
+    """
+
+    def __init__(self, file_path):
+        register_fonts()
+        self.canvas = CompressedPageCanvas(file_path, pagesize=PAGE_SIZE)
+        self.canvas.setTitle("Отчёт по анализу проекта")
+        self.y = PAGE_SIZE[1] - MARGIN  # верхняя граница свободного места страницы
+        self.dirty = False
+
+    def new_page(self):
+        if self.dirty:
+            self.canvas.showPage()
+        self.canvas.setPageSize(PAGE_SIZE)
+        self.y = PAGE_SIZE[1] - MARGIN
+        self.dirty = False
+
+    def space_left(self):
+        return self.y - MARGIN
+
+    def heading(self, text, level=1):
+        size = HEADING_SIZES[level]
+        height = size * 1.8
+        # Заголовок не остаётся в конце страницы без содержимого
+        if self.space_left() < height + 4 * LEADING:
+            self.new_page()
+        self.canvas.setFont(BOLD_FONT, size)
+        self.canvas.drawString(MARGIN, self.y - size, text)
+        self.y -= height
+        self.dirty = True
+
+    def paragraph(self, text):
+        if self.space_left() < 2 * LEADING:
+            self.new_page()
+        self.canvas.setFont(FONT, FONT_SIZE + 2)
+        self.canvas.drawString(MARGIN, self.y - FONT_SIZE - 2, text)
+        self.y -= 2 * LEADING
+        self.dirty = True
+
+    def table(self, headers, rows, total=0, progress=None):
+        """Таблица с сеткой; rows — итерируемые строки уже отформатированных значений.
+
+        Заголовок повторяется на каждой странице, длинные значения переносятся.
+        После каждой страницы ход записи total строк сообщается в progress.
+        """
+        rows = iter(rows)
+        sample = list(itertools.islice(rows, SAMPLE_ROWS))
+        widths = column_widths(headers, sample, PAGE_SIZE[0] - 2 * MARGIN)
+        text_widths = [w - 2 * CELL_PADDING for w in widths]
+        header = [wrap_cell(text, BOLD_FONT, width) for text, width in zip(headers, text_widths)]
+        header_lines = max(len(cell) for cell in header)
+
+        page = []  # строки текущей страницы: (ячейки, число строк текста)
+        used = 0
+        done = 0
+        for row in itertools.chain(sample, rows):
+            cells = [wrap_cell(text, FONT, width) for text, width in zip(row, text_widths)]
+            lines = max(len(cell) for cell in cells)
+            capacity = self.table_capacity(header_lines)
+            if used + lines > capacity and page:
+                self.draw_table_page(widths, header, page)
+                self.new_page()
+                if progress is not None:
+                    progress.report(done, total)
+                    progress.check_cancelled()
+                page, used = [], 0
+                capacity = self.table_capacity(header_lines)
+            if capacity < 1:
+                self.new_page()
+                capacity = self.table_capacity(header_lines)
+            if lines > capacity:
+                # Строка выше страницы обрезается
+                cells = [cell[:capacity] for cell in cells]
+                lines = capacity
+            page.append((cells, lines))
+            used += lines
+            done += 1
+        self.draw_table_page(widths, header, page)
+
+    def table_capacity(self, header_lines):
+        """Сколько строк текста таблицы помещается на остаток страницы"""
+        return int(self.space_left() // LEADING) - header_lines
+
+    def draw_column(self, x, top, lines, font):
+        # Текст столбца страницы — один текстовый объект
+        text = self.canvas.beginText(x, top - BASELINE)
+        text.setFont(font, FONT_SIZE, LEADING)
+        text.textLines(lines, trim=0)
+        self.canvas.drawText(text)
+
+    def draw_table_page(self, widths, header, page):
+        canvas = self.canvas
+        lefts = [MARGIN + sum(widths[:j]) for j in range(len(widths))]
+        right = MARGIN + sum(widths)
+        top = self.y
+
+        header_lines = max(len(cell) for cell in header)
+        for left, cell in zip(lefts, header):
+            self.draw_column(left + CELL_PADDING, top, cell, BOLD_FONT)
+        boundaries = [top, top - header_lines * LEADING]
+
+        body_top = boundaries[-1]
+        for j, left in enumerate(lefts):
+            column = []
+            for cells, lines in page:
+                cell = cells[j]
+                column.extend(cell)
+                column.extend([""] * (lines - len(cell)))  # пустые строки выравнивают столбцы
+            if column:
+                self.draw_column(left + CELL_PADDING, body_top, column, FONT)
+        y = body_top
+        for _, lines in page:
+            y -= lines * LEADING
+            boundaries.append(y)
+
+        # Сетка «Table Grid»: горизонтальные границы строк и вертикальные столбцов
+        canvas.saveState()
+        canvas.setStrokeColorRGB(*GRID_COLOR)
+        canvas.setLineWidth(0.4)
+        canvas.lines(
+            [(MARGIN, b, right, b) for b in boundaries]
+            + [(x, top, x, y) for x in lefts + [right]]
+        )
+        canvas.restoreState()
+        self.dirty = True
+        self.y = y - LEADING
+
+    def charts(self, df, chart_types, heading, progress=None, key=None):
+        """Каждый график — отдельная альбомная страница с рисунком PNG.
+
+        Рисунки берутся из chart_images по одному, чтобы ход и отмена
+        проверялись перед каждым графиком; key — ключ графиков в кэше разделов.
+        """
+        self.new_page()
+        width, height = landscape(PAGE_SIZE)
+        title_height = 60
+        for i, chart_type in enumerate(chart_types):
+            if progress is not None:
+                progress.report(i, len(chart_types))
+                progress.check_cancelled()
+            [(_, image)] = chart_images(df, key, [chart_type], parallel=False)
+            canvas = self.canvas
+            canvas.setPageSize((width, height))
+            if i == 0:
+                canvas.setFont(BOLD_FONT, HEADING_SIZES[1])
+                canvas.drawString(MARGIN, height - MARGIN - HEADING_SIZES[1], heading)
+            canvas.setFont(FONT, 10)
+            canvas.drawString(MARGIN, height - MARGIN - title_height + 18, chart_type)
+
+            # Рисунок вписывается в страницу с сохранением пропорций, прижат к заголовку
+            picture = Image(
+                image, width - 2 * MARGIN, height - 2 * MARGIN - title_height, kind="proportional"
+            )
+            picture.drawOn(canvas, MARGIN, height - MARGIN - title_height - picture.drawHeight)
+            canvas.showPage()
+        self.canvas.setPageSize(PAGE_SIZE)
+
+    def close(self):
+        if self.dirty:
+            self.canvas.showPage()
+        self.canvas.save()
+
+
+def build_pdf_report(file_path, snapshot, progress=None, with_charts=True,
+                     chart_types=charts.EXPORT_CHARTS):
+    """Записывает отчёт PDF по снимку ReportSnapshot с теми же разделами, что и отчёт Word.
+
+    progress — ReportProgress для отображения хода и отмены.
+    """
+    progress = progress or ReportProgress()
+    writer = PdfReportWriter(file_path)
+    writer.heading("Отчёт по анализу проекта", 0)
+    project_data, calc_data = snapshot.project_data, snapshot.calc_data
+
+    with progress.section(0) as span:
+        span.set(rows=snapshot.rows("project"))
+        if project_data is not None:
+            writer.heading("1. Данные проекта")
+            writer.table(
+                [str(col) for col in project_data.columns], zip(*project_columns(project_data)),
+                len(project_data), progress
+            )
+        else:
+            writer.paragraph("Данные проекта отсутствуют.")
+
+    with progress.section(1) as span:
+        span.set(rows=snapshot.rows("metrics"))
+        if calc_data is not None:
+            writer.heading("2. Рассчитанные метрики")
+            writer.table(METRIC_COLUMNS, zip(*metric_columns(calc_data)), len(calc_data), progress)
+        else:
+            writer.paragraph("Рассчитанные метрики отсутствуют.")
+
+    with progress.section(2) as span:
+        recommendations = snapshot.recommendation_rows()
+        span.set(rows=len(recommendations))
+        if recommendations:
+            writer.heading("3. Рекомендации")
+            writer.table(["Этап"] + REPORT_FIELDS, recommendations, len(recommendations), progress)
+        else:
+            writer.paragraph("Рекомендации отсутствуют.")
+
+    with progress.section(3) as span:
+        if with_charts and calc_data is not None and chart_types:
+            span.set(charts=len(chart_types))
+            writer.charts(calc_data, chart_types, "4. Графики", progress, snapshot.key("charts"))
+        else:
+            writer.paragraph("Графики отсутствуют.")
+
+    with progress.section(4):
+        writer.close()
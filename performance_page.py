@@ -0,0 +1,134 @@
+from PyQt5.QtWidgets import (
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QTreeWidget, QTreeWidgetItem,
+    QHeaderView, QFileDialog
+)
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QMessageBox
+from view import tracing
+import time
+
+
+# Период проверки новых запусков, пока страница открыта
+REFRESH_INTERVAL_MS = 1000
+
+
+def format_attrs(attrs):
+    return ", ".join(f"{key}={value}" for key, value in attrs.items())
+
+
+class PerformancePage(QWidget):
+    """Последние запуски этапов обработки с вложенными спанами трассировки"""
+
+    def __init__(self):
+        super().__init__()
+        self.shown_generation = None
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        layout.setAlignment(Qt.AlignTop)
+
+        self.setStyleSheet("""
+            QLabel#perfTitle {
+                font-size: 20px;
+                font-weight: bold;
+                color: #232526;
+                margin-bottom: 8px;
+            }
+            QLabel#perfDesc {
+                font-size: 15px;
+                color: #4a4a4a;
+                margin-bottom: 18px;
+            }
+            QTreeWidget {
+                background: #f8fafc;
+                border: 1px solid #e0e7ef;
+                border-radius: 10px;
+                font-size: 14px;
+                color: #232526;
+                selection-background-color: #e0f7fa;
+                selection-color: #00796b;
+            }
+        """)
+
+        title = QLabel("Вкладка: Производительность")
+        title.setObjectName("perfTitle")
+        layout.addWidget(title)
+
+        self.description = QLabel(
+            f"Время этапов обработки за последние {tracing.MAX_RUNS} запусков. "
+            "Трассировку можно открыть в chrome://tracing или Perfetto."
+        )
+        self.description.setObjectName("perfDesc")
+        self.description.setWordWrap(True)
+        layout.addWidget(self.description)
+
+        buttons = QHBoxLayout()
+        self.export_btn = QPushButton("💾 Экспорт трассировки (Chrome)")
+        self.export_btn.clicked.connect(self.export_trace)
+        buttons.addWidget(self.export_btn)
+        self.clear_btn = QPushButton("🗑 Очистить")
+        self.clear_btn.clicked.connect(self.clear_runs)
+        buttons.addWidget(self.clear_btn)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Этап", "Время, мс", "Начало", "Атрибуты"])
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Interactive)
+        self.tree.setColumnWidth(0, 320)
+        self.tree.setColumnWidth(1, 110)
+        self.tree.setColumnWidth(2, 90)
+        layout.addWidget(self.tree)
+
+        self.setLayout(layout)
+
+        # Запуски завершаются и в фоновых потоках — список обновляется по таймеру
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def refresh(self):
+        """Перестраивает дерево, если с прошлого показа появились новые запуски"""
+        if tracing.tracer.generation == self.shown_generation:
+            return
+        self.shown_generation = tracing.tracer.generation
+        self.tree.clear()
+        for run in tracing.tracer.last_runs():
+            self.tree.addTopLevelItem(self.span_item(run))
+
+    def span_item(self, span):
+        item = QTreeWidgetItem([
+            span.name,
+            f"{span.duration * 1000:.1f}",
+            time.strftime("%H:%M:%S", time.localtime(span.wall_start)),
+            format_attrs(span.attrs),
+        ])
+        item.setTextAlignment(1, Qt.AlignRight | Qt.AlignVCenter)
+        for child in span.children:
+            item.addChild(self.span_item(child))
+        return item
+
+    def export_trace(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Сохранить трассировку", "trace.json", "Chrome Trace (*.json)"
+        )
+        if not file_path:
+            return
+        try:
+            tracing.tracer.export_chrome_trace(file_path)
+        except OSError as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить трассировку: {str(e)}")
+
+    def clear_runs(self):
+        tracing.tracer.clear()
+        self.refresh()
@@ -0,0 +1,128 @@
+import os
+import numpy as np
+import pandas as pd
+from view.project_io import DATE_COLUMNS, concat_column
+from view.project_dataset import ProjectDataset
+from view import recommendation_engine, tracing
+
+
+# Столбец ключа проекта в общей таблице этапов портфеля
+PROJECT_COLUMN = "Проект"
+
+# Столбцы сводки по проектам в порядке отображения
+SUMMARY_COLUMNS = [
+    PROJECT_COLUMN, "Этапов", "Начало", "Окончание", "ΔT", "ΔC", "E",
+    "План. бюджет", "Факт. бюджет", "Этапов с задержкой", "Рекомендаций", "Некорректных дат"
+]
+
+
+def project_names(paths):
+    """Имена проектов по именам файлов; повторяющиеся имена нумеруются"""
+    names = []
+    seen = {}
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+    return names
+
+
+def stack_projects(frames, columns):
+    """Склеивает таблицы проектов по столбцам; столбцы, которых нет в проекте, — пропуски.
+
+    Таблицы проектов остаются у вызывающего, поэтому, в отличие от
+    concat_chunks, столбцы не извлекаются из исходных таблиц.
+    """
+    result = {}
+    for col in columns:
+        parts = [
+            df[col] if col in df.columns else pd.Series(np.nan, index=pd.RangeIndex(len(df)))
+            for df in frames
+        ]
+        result[col] = concat_column(parts, col)
+    return pd.DataFrame(result, columns=columns)
+
+
+def ratio_percent(fact, plan):
+    """Отклонение суммы факта от суммы плана, %"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (fact - plan) / plan * 100
+
+
+class Portfolio:
+    """Этапы многих проектов в одной таблице с ключом проекта.
+
+    Этапы проектов хранятся подряд, в порядке загрузки, поэтому этапы одного
+    проекта — непрерывный диапазон строк (offsets). Метрики и рекомендации
+    рассчитываются одним проходом по всем этапам, сводка по проектам —
+    группировкой по ключу; время и память линейны по общему числу этапов.
+    """
+
+    def __init__(self, projects, rules=None):
+        """projects — список (имя проекта, DataFrame этапов)"""
+        self.names = [name for name, _ in projects]
+        sizes = np.array([len(df) for _, df in projects], dtype="int64")
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)])
+        # Собственные столбцы каждого проекта — для выделения проекта без чужих столбцов
+        self.project_columns = [list(df.columns) for _, df in projects]
+        columns = list(dict.fromkeys(col for df_columns in self.project_columns for col in df_columns))
+
+        with tracing.span("Объединение проектов", projects=len(projects), rows=int(sizes.sum())):
+            raw = stack_projects([df for _, df in projects], columns)
+            raw.insert(0, PROJECT_COLUMN, pd.Categorical.from_codes(
+                np.repeat(np.arange(len(projects)), sizes), categories=self.names
+            ))
+        self.dataset = ProjectDataset(raw)
+        self.rules = rules or recommendation_engine.load_rules()
+        self.recommendations = recommendation_engine.evaluate(self.dataset.frame, self.rules)
+        with tracing.span("Сводка по проектам", projects=len(projects)):
+            self.summary = self.summarise()
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def stage_count(self):
+        return int(self.offsets[-1])
+
+    def project_codes(self):
+        """Номер проекта каждого этапа"""
+        return self.dataset.frame[PROJECT_COLUMN].cat.codes.to_numpy()
+
+    def summarise(self):
+        """Сводная таблица: одна строка на проект"""
+        frame = self.dataset.frame
+        key = frame[PROJECT_COLUMN]
+        # Пустые группы сохраняются, чтобы строки сводки шли в порядке проектов
+        grouped = frame.groupby(key, observed=False, sort=False)
+        summary = grouped.agg(**{
+            "Этапов": ("Этап", "size"),
+            "Начало": ("Дата начала", "min"),
+            "Окончание": ("Дата окончания", "max"),
+            "План длительность": ("План длительность", "sum"),
+            "Факт длительность": ("Факт длительность", "sum"),
+            "План. бюджет": ("План. бюджет", "sum"),
+            "Факт. бюджет": ("Факт. бюджет", "sum"),
+        }).reindex(self.names)
+        summary["Этапов с задержкой"] = (frame["ΔT"] > 0).groupby(key, observed=False).sum()
+        summary["Некорректных дат"] = frame[DATE_COLUMNS].isna().any(axis=1).groupby(key, observed=False).sum()
+
+        # Метрики проекта — по суммам длительностей и бюджетов этапов,
+        # поэтому крупные этапы весят больше мелких
+        plan, fact = summary.pop("План длительность"), summary.pop("Факт длительность")
+        summary["ΔT"] = ratio_percent(fact, plan)
+        summary["ΔC"] = ratio_percent(summary["Факт. бюджет"], summary["План. бюджет"])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            summary["E"] = 1 - plan / fact
+
+        stage_project = self.project_codes()[self.recommendations["stage"].to_numpy()]
+        summary["Рекомендаций"] = np.bincount(stage_project, minlength=len(self.names))
+        summary = summary.rename_axis(PROJECT_COLUMN).reset_index()
+        summary[PROJECT_COLUMN] = summary[PROJECT_COLUMN].astype("str")
+        return summary[SUMMARY_COLUMNS]
+
+    def project(self, name):
+        """Исходные этапы одного проекта — для страниц одного проекта"""
+        position = self.names.index(name)
+        start, stop = self.offsets[position], self.offsets[position + 1]
+        return self.dataset.raw.iloc[start:stop][self.project_columns[position]].reset_index(drop=True)
@@ -0,0 +1,204 @@
+from PyQt5.QtWidgets import (
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog,
+    QTableView, QProgressBar, QAbstractItemView
+)
+from PyQt5.QtWidgets import QMessageBox
+from PyQt5.QtCore import Qt, QThread
+from view.project_loader import PortfolioLoader
+from view.import_cache import ImportCache
+from view.table_models import DataFrameModel
+from view.formatting import METRIC_FORMATTERS
+from view.portfolio import PROJECT_COLUMN, SUMMARY_COLUMNS
+from view import tracing
+
+
+class PortfolioPage(QWidget):
+    """Портфель: сводка по многим проектам с переходом к отдельному проекту"""
+
+    def __init__(self):
+        super().__init__()
+        self.portfolio = None
+        self.loader = None
+        self.loader_thread = None
+        self.import_cache = ImportCache()
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        layout.setAlignment(Qt.AlignTop)
+
+        self.setStyleSheet("""
+            QLabel#portfolioTitle {
+                font-size: 20px;
+                font-weight: bold;
+                color: #232526;
+                margin-bottom: 8px;
+            }
+            QLabel#portfolioDesc {
+                font-size: 15px;
+                color: #4a4a4a;
+                margin-bottom: 18px;
+            }
+            QTableView {
+                background: #f8fafc;
+                border: 1px solid #e0e7ef;
+                border-radius: 10px;
+                font-size: 15px;
+                color: #232526;
+                selection-background-color: #e0f7fa;
+                selection-color: #00796b;
+                gridline-color: #e0e7ef;
+                padding: 4px;
+            }
+            QTableView::item {
+                padding: 8px;
+            }
+        """)
+
+        title = QLabel("Вкладка: Портфель")
+        title.setObjectName("portfolioTitle")
+        layout.addWidget(title)
+
+        self.description = QLabel(
+            "Сводка по проектам портфеля: ΔT и E — по суммам длительностей этапов, "
+            "ΔC — по суммам бюджетов. Двойной щелчок по проекту открывает его на остальных вкладках."
+        )
+        self.description.setObjectName("portfolioDesc")
+        self.description.setWordWrap(True)
+        layout.addWidget(self.description)
+
+        buttons = QHBoxLayout()
+        self.import_btn = QPushButton("📂 Импортировать проекты")
+        self.import_btn.clicked.connect(self.load_portfolio)
+        buttons.addWidget(self.import_btn)
+        self.open_btn = QPushButton("🔎 Открыть проект")
+        self.open_btn.clicked.connect(self.open_selected_project)
+        self.open_btn.setEnabled(False)
+        buttons.addWidget(self.open_btn)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+
+        # Ход импорта: прогресс по файлам и отмена
+        progress_layout = QHBoxLayout()
+        self.import_progress = QProgressBar()
+        self.import_progress.setVisible(False)
+        progress_layout.addWidget(self.import_progress, stretch=1)
+
+        self.cancel_import_btn = QPushButton("✖ Отменить импорт")
+        self.cancel_import_btn.clicked.connect(self.cancel_import)
+        self.cancel_import_btn.setVisible(False)
+        progress_layout.addWidget(self.cancel_import_btn)
+        layout.addLayout(progress_layout)
+
+        self.import_status = QLabel("")
+        layout.addWidget(self.import_status)
+
+        self.table = QTableView()
+        self.table_model = DataFrameModel(columns=SUMMARY_COLUMNS, formatters=METRIC_FORMATTERS)
+        self.table.setModel(self.table_model)
+        self.table.setSortingEnabled(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setDefaultSectionSize(130)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.doubleClicked.connect(lambda index: self.open_project(index.row()))
+        layout.addWidget(self.table)
+
+        self.setLayout(layout)
+
+    def load_portfolio(self):
+        if self.loader is not None:
+            return
+
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Выберите файлы проектов",
+            "",
+            "Файлы проектов (*.xlsx *.csv *.json *.jsonl *.ndjson)"
+        )
+
+        if not file_paths:
+            return
+
+        # Чтение файлов и расчёт портфеля выполняются в отдельном потоке
+        self.loader_thread = QThread(self)
+        self.loader = PortfolioLoader(file_paths, self.import_cache)
+        self.loader.moveToThread(self.loader_thread)
+
+        self.loader_thread.started.connect(self.loader.run)
+        self.loader.progress.connect(self.on_import_progress)
+        self.loader.loaded.connect(self.on_import_loaded)
+        self.loader.failed.connect(self.on_import_failed)
+        self.loader.cancelled.connect(self.on_import_cancelled)
+        for signal in (self.loader.loaded, self.loader.failed, self.loader.cancelled):
+            signal.connect(self.loader_thread.quit)
+        self.loader_thread.finished.connect(self.loader.deleteLater)
+        self.loader_thread.finished.connect(self.loader_thread.deleteLater)
+
+        self.set_import_running(True)
+        self.import_status.setText(f"Импорт проектов: {len(file_paths)}...")
+        self.loader_thread.start()
+
+    def cancel_import(self):
+        if self.loader is not None:
+            self.loader.cancel()
+            self.cancel_import_btn.setEnabled(False)
+            self.import_status.setText("Отмена импорта...")
+
+    def set_import_running(self, running):
+        self.import_btn.setEnabled(not running)
+        self.open_btn.setEnabled(not running and self.portfolio is not None)
+        self.import_progress.setVisible(running)
+        self.import_progress.setRange(0, 0)
+        self.cancel_import_btn.setVisible(running)
+        self.cancel_import_btn.setEnabled(running)
+        if not running:
+            self.loader = None
+            self.loader_thread = None
+
+    def on_import_progress(self, files_done, files_total, rows_read):
+        self.import_progress.setRange(0, files_total)
+        self.import_progress.setValue(files_done)
+        if files_done < files_total:
+            self.import_status.setText(
+                f"Загружено файлов: {files_done} из {files_total}, этапов: {rows_read}"
+            )
+        else:
+            self.import_status.setText(f"Расчёт метрик и рекомендаций по {rows_read} этапам...")
+
+    def on_import_loaded(self, portfolio, errors):
+        self.portfolio = portfolio
+        self.set_import_running(False)
+        self.import_status.setText(
+            f"Проектов: {len(portfolio)}, этапов: {portfolio.stage_count}"
+            + (f", не загружено файлов: {len(errors)}" if errors else "")
+        )
+        with tracing.span("Таблица портфеля", rows=len(portfolio)):
+            self.table_model.set_frame(portfolio.summary)
+            self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        if errors:
+            QMessageBox.warning(self, "Портфель", "Не загружены файлы:\n" + "\n".join(errors))
+
+    def on_import_failed(self, message):
+        self.set_import_running(False)
+        self.import_status.setText("")
+        QMessageBox.critical(self, "Ошибка", message)
+
+    def on_import_cancelled(self):
+        self.set_import_running(False)
+        self.import_status.setText("Импорт отменён.")
+
+    def open_selected_project(self):
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
+            QMessageBox.warning(self, "Портфель", "Выберите проект в таблице.")
+            return
+        self.open_project(rows[0].row())
+
+    def open_project(self, row):
+        """Переход к проекту: строка таблицы (с учётом сортировки) -> имя проекта"""
+        if self.portfolio is None:
+            return
+        name = self.table_model.frame()[PROJECT_COLUMN].iloc[self.table_model.source_row(row)]
+        self.window().open_portfolio_project(self.portfolio, name)
@@ -0,0 +1,193 @@
+import itertools
+import numpy as np
+import pandas as pd
+from view.project_io import (
+    DATE_COLUMNS, NUMERIC_COLUMNS, validate_columns, apply_schema, concat_chunks
+)
+from view import tracing
+
+
+# Глобальный счётчик версий наборов данных
+_versions = itertools.count(1)
+
+
+def derive_columns(df):
+    """Добавляет в df рассчитанные столбцы (длительности, отклонения, метрики)"""
+    plan = (df["Дата окончания"] - df["Дата начала"]).dt.days
+    fact = (df["Факт окончания"] - df["Факт начала"]).dt.days
+
+    # Длительности этапов, дни
+    df["План длительность"] = plan
+    df["Факт длительность"] = fact
+
+    # ΔT — отклонение по времени (%)
+    df["ΔT"] = ((fact - plan) / plan) * 100
+
+    # ΔC — перерасход бюджета (%)
+    df["ΔC"] = ((df["Факт. бюджет"] - df["План. бюджет"]) / df["План. бюджет"]) * 100
+
+    # E — эффективность ресурсов
+    df["E"] = 1 - (plan / fact)
+
+    # Абсолютные отклонения для графиков анализа
+    df["∆T"] = (df["Факт окончания"] - df["Факт начала"]) - (df["Дата окончания"] - df["Дата начала"])
+    df["∆T_days"] = df["∆T"].dt.days
+    df["∆C"] = df["Факт. бюджет"] - df["План. бюджет"]
+    return df
+
+
+# Столбцы, которые добавляет derive_columns
+DERIVED_COLUMNS = ["План длительность", "Факт длительность", "ΔT", "ΔC", "E", "∆T", "∆T_days", "∆C"]
+
+
+def normalise_rows(rows):
+    """Приводит даты и числа изменённых строк к типам схемы"""
+    rows = rows.copy()
+    for col in DATE_COLUMNS:
+        if col in rows.columns:
+            rows[col] = pd.to_datetime(rows[col], errors='coerce')
+    for col in NUMERIC_COLUMNS:
+        if col in rows.columns:
+            rows[col] = pd.to_numeric(rows[col], errors='coerce').astype("float64")
+    return rows
+
+
+# Форматы дат при правке ячейки: как в таблице (format_value) и ISO
+EDIT_DATE_FORMATS = ["%d.%m.%Y", "%Y-%m-%d"]
+
+
+def parse_cell(column, text):
+    """Значение, введённое в ячейку таблицы, в типе столбца схемы.
+
+    Пустой текст — пропуск; нераспознанная дата или число — ValueError.
+    """
+    text = str(text).strip()
+    if column in DATE_COLUMNS:
+        if not text:
+            return pd.NaT
+        for fmt in EDIT_DATE_FORMATS:
+            value = pd.to_datetime(text, format=fmt, errors="coerce")
+            if not pd.isna(value):
+                return value
+        raise ValueError(f"«{text}» — не дата (ожидается ДД.ММ.ГГГГ)")
+    if column in NUMERIC_COLUMNS:
+        if not text:
+            return np.nan
+        try:
+            return float(text.replace(" ", "").replace(",", "."))
+        except ValueError:
+            raise ValueError(f"«{text}» — не число") from None
+    return text
+
+
+def assign_column(frame, col, labels, values):
+    """Записывает значения столбца в строки labels, расширяя тип при необходимости"""
+    current = frame[col]
+    if isinstance(current.dtype, pd.CategoricalDtype):
+        new = pd.Index(values.dropna().unique()).difference(current.cat.categories)
+        if len(new):
+            frame[col] = current.cat.add_categories(new)
+    elif current.dtype.kind in "iu" and values.dtype != current.dtype:
+        # Целочисленный столбец без пропусков, а в новых значениях они есть
+        frame[col] = current.astype("float64")
+    frame.loc[labels, col] = values.to_numpy()
+
+
+class StageChanges:
+    """Описание изменения набора этапов в позициях строк.
+
+    removed — позиции удалённых этапов в прежней таблице, updated — позиции
+    изменённых этапов в новой таблице, inserted — позиции добавленных этапов
+    в новой таблице (добавляются в конец).
+    """
+
+    def __init__(self, removed, updated, inserted):
+        self.removed = np.asarray(removed, dtype="int64")
+        self.updated = np.asarray(updated, dtype="int64")
+        self.inserted = np.asarray(inserted, dtype="int64")
+
+    def __bool__(self):
+        return bool(len(self.removed) or len(self.updated) or len(self.inserted))
+
+
+class ProjectDataset:
+    """Нормализованные данные проекта, общие для всех страниц.
+
+    Строится один раз на импорт: даты разобраны, длительности и отклонения
+    рассчитаны. Страницы только читают frame и по version определяют,
+    обрабатывали ли они уже этот набор. Метки индекса frame — постоянные
+    идентификаторы этапов, по ним задаются изменения в apply_changes.
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        # Поверхностная копия: новые столбцы не попадают в исходную таблицу
+        frame = raw.copy(deep=False)
+        with tracing.span("Разбор дат", rows=len(frame)):
+            for col in DATE_COLUMNS:
+                if not pd.api.types.is_datetime64_any_dtype(frame[col]):
+                    frame[col] = pd.to_datetime(frame[col], errors='coerce')
+            self.dates_valid = not frame[DATE_COLUMNS].isna().any().any()
+        with tracing.span("Производные столбцы", rows=len(frame)):
+            self.frame = derive_columns(frame)
+        self.version = next(_versions)
+        self._next_label = int(frame.index.max()) + 1 if len(frame) else 0
+
+    def __len__(self):
+        return len(self.frame)
+
+    def apply_changes(self, updated=None, inserted=None, deleted=None):
+        """Применяет изменения этапов и возвращает StageChanges.
+
+        updated — DataFrame с новыми значениями, индекс — метки существующих
+        этапов; inserted — DataFrame новых этапов; deleted — метки удаляемых
+        этапов. Производные столбцы пересчитываются только для изменённых
+        и добавленных строк.
+        """
+        # Прежняя таблица не изменяется на месте: новые значения записываются в
+        # поверхностную копию, и при Copy-on-Write (включён в project_io) страницы
+        # и снимки отчётов, держащие прежнюю таблицу, изменений не видят
+        frame = self.frame
+        deleted = pd.Index(deleted if deleted is not None else [])
+        unknown = deleted.difference(frame.index)
+        if len(unknown):
+            raise ValueError(f"Неизвестные этапы: {', '.join(map(str, unknown))}")
+        removed = np.sort(frame.index.get_indexer(deleted))
+        if len(deleted):
+            frame = frame.drop(index=deleted)
+        else:
+            frame = frame.copy(deep=False)
+
+        updated_positions = []
+        if updated is not None and len(updated):
+            # Изменения удалённых этапов не применяются
+            updated = updated.loc[updated.index.difference(deleted, sort=False)]
+            unknown = updated.index.difference(frame.index)
+            if len(unknown):
+                raise ValueError(f"Неизвестные этапы: {', '.join(map(str, unknown))}")
+            rows = normalise_rows(updated)
+            for col in rows.columns:
+                if col in frame.columns and col not in DERIVED_COLUMNS:
+                    assign_column(frame, col, rows.index, rows[col])
+            derived = derive_columns(frame.loc[rows.index, frame.columns.difference(DERIVED_COLUMNS)].copy())
+            for col in DERIVED_COLUMNS:
+                assign_column(frame, col, rows.index, derived[col])
+            updated_positions = np.sort(frame.index.get_indexer(rows.index))
+
+        inserted_positions = []
+        if inserted is not None and len(inserted):
+            validate_columns(inserted)
+            new = derive_columns(apply_schema(inserted.copy()))
+            new = new.reindex(columns=frame.columns)
+            start = self._next_label
+            self._next_label += len(new)
+            labels = frame.index.append(pd.RangeIndex(start, self._next_label))
+            inserted_positions = np.arange(len(frame), len(frame) + len(new))
+            frame = concat_chunks([frame.copy(deep=False), new])
+            frame.index = labels
+
+        self.frame = frame
+        self.raw = frame[list(self.raw.columns)]
+        self.dates_valid = not frame[DATE_COLUMNS].isna().any().any()
+        self.version = next(_versions)
+        return StageChanges(removed, updated_positions, inserted_positions)
@@ -0,0 +1,131 @@
+import os
+import pandas as pd
+from pandas.api.types import union_categoricals
+from view import tracing
+
+# Поверхностные копии таблиц (снимки отчётов, изменение этапов) безопасны между
+# потоками только при Copy-on-Write. В pandas 3 он всегда включён, в pandas 2 —
+# включается здесь: модуль импортируется всеми путями загрузки данных
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+# Обязательные столбцы файла проекта
+REQUIRED_COLUMNS = [
+    "Этап", "Ответственный", "Дата начала", "Дата окончания",
+    "Факт начала", "Факт окончания", "План. бюджет", "Факт. бюджет", "Ресурсы"
+]
+
+# Фиксированная схема обязательных столбцов
+TEXT_COLUMNS = {"Этап": "str", "Ответственный": "category"}
+DATE_COLUMNS = ["Дата начала", "Дата окончания", "Факт начала", "Факт окончания"]
+NUMERIC_COLUMNS = ["План. бюджет", "Факт. бюджет", "Ресурсы"]
+
+# Форматы, которые читаются потоково, порциями строк
+STREAMING_EXTENSIONS = (".csv", ".jsonl", ".ndjson")
+
+# Размер порции строк при потоковом чтении. Разбор JSON создаёт
+# промежуточные Python-объекты на каждую запись, поэтому порция меньше.
+CSV_CHUNK_ROWS = 50_000
+JSON_LINES_CHUNK_ROWS = 10_000
+
+
+class ImportCancelled(Exception):
+    """Импорт прерван пользователем"""
+
+
+def validate_columns(df):
+    """Проверяет наличие обязательных столбцов"""
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Отсутствуют столбцы: {', '.join(missing)}")
+
+
+def apply_schema(df):
+    """Приводит обязательные столбцы к компактным типам схемы (на месте)"""
+    for col, dtype in TEXT_COLUMNS.items():
+        if df[col].dtype != dtype:
+            df[col] = df[col].astype(dtype)
+    for col in DATE_COLUMNS:
+        df[col] = pd.to_datetime(df[col], errors='coerce')
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype("float64")
+    return df
+
+
+def concat_column(parts, name):
+    """Склеивает части одного столбца; категории категориальных частей объединяются"""
+    if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+        return pd.Series(union_categoricals(parts), name=name)
+    return pd.concat(parts, ignore_index=True).rename(name)
+
+
+def concat_chunks(chunks):
+    """Склеивает типизированные порции по столбцам, освобождая исходные порции"""
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = list(chunks[0].columns)
+    result = {}
+    for col in columns:
+        parts = [chunk.pop(col) for chunk in chunks]
+        result[col] = concat_column(parts, col)
+        del parts
+    return pd.DataFrame(result, columns=columns)
+
+
+def iter_chunks(ext, f):
+    """Итератор порций для потоковых форматов"""
+    if ext == ".csv":
+        return pd.read_csv(f, chunksize=CSV_CHUNK_ROWS, dtype=TEXT_COLUMNS)
+    return pd.read_json(f, lines=True, chunksize=JSON_LINES_CHUNK_ROWS, dtype=False, convert_dates=False)
+
+
+def read_project(file_path, progress=None, is_cancelled=None):
+    """Читает файл проекта и проверяет наличие обязательных столбцов.
+
+    CSV и JSON Lines читаются порциями: каждая порция сразу приводится к
+    схеме, поэтому пиковая память близка к размеру итоговой таблицы.
+    progress(bytes_read, total_bytes, rows_read) вызывается по мере чтения,
+    is_cancelled() проверяется между порциями данных.
+    """
+    total_bytes = os.path.getsize(file_path)
+    ext = os.path.splitext(file_path)[1].lower()
+    with tracing.span("Чтение файла", format=ext, bytes=total_bytes) as s:
+        def report(bytes_read, rows_read):
+            if progress is not None:
+                progress(bytes_read, total_bytes, rows_read)
+
+        def check_cancelled():
+            if is_cancelled is not None and is_cancelled():
+                raise ImportCancelled()
+
+        report(0, 0)
+        if ext in STREAMING_EXTENSIONS:
+            chunks = []
+            rows_read = 0
+            with open(file_path, "rb") as f:
+                for chunk in iter_chunks(ext, f):
+                    check_cancelled()
+                    if not chunks:
+                        validate_columns(chunk)
+                    chunks.append(apply_schema(chunk))
+                    rows_read += len(chunk)
+                    report(f.tell(), rows_read)
+            if not chunks:
+                raise ValueError("Файл проекта не содержит данных")
+            with tracing.span("Объединение порций", chunks=len(chunks)):
+                df = concat_chunks(chunks)
+        else:
+            if ext == ".xlsx":
+                df = pd.read_excel(file_path)
+            elif ext == ".json":
+                df = pd.read_json(file_path)
+            else:
+                raise ValueError("Неподдерживаемый формат файла")
+            check_cancelled()
+            validate_columns(df)
+            apply_schema(df)
+
+        report(total_bytes, len(df))
+        s.set(rows=len(df))
+    return df
@@ -0,0 +1,141 @@
+import os
+from PyQt5.QtCore import QObject, pyqtSignal
+from view.project_io import read_project, ImportCancelled
+from view.portfolio import Portfolio, project_names
+from view import tracing
+
+
+def load_from_cache(cache, file_path):
+    if cache is None:
+        return None
+    try:
+        with tracing.span("Чтение кэша импорта") as span:
+            df = cache.load(file_path)
+            span.set(hit=df is not None)
+    except Exception as e:
+        # Недоступный кэш не мешает импорту: файл разбирается заново
+        tracing.annotate(cache_error=f"{type(e).__name__}: {e}")
+        return None
+    return df
+
+
+def store_in_cache(cache, file_path, df):
+    if cache is None:
+        return
+    try:
+        with tracing.span("Запись кэша импорта", rows=len(df)):
+            cache.store(file_path, df)
+    except Exception as e:
+        # Кэш — только ускорение, импорт без него остаётся успешным;
+        # причина отмечается в спане импорта (страница производительности)
+        tracing.annotate(cache_error=f"{type(e).__name__}: {e}")
+
+
+class ProjectLoader(QObject):
+    """Фоновая загрузка файла проекта (выполняется в отдельном QThread)"""
+
+    # qint64: int сигнала Qt — 32-битный, и объём файлов больше 2 ГБ переполнял бы его
+    progress = pyqtSignal("qint64", "qint64", "qint64")  # прочитано байт, всего байт, прочитано строк
+    loaded = pyqtSignal(object, bool)     # DataFrame проекта, взят ли он из кэша
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, file_path, cache=None):
+        super().__init__()
+        self.file_path = file_path
+        self.cache = cache
+        self._cancel_requested = False
+
+    def run(self):
+        with tracing.span("Импорт проекта", file=os.path.basename(self.file_path)) as span:
+            try:
+                df = load_from_cache(self.cache, self.file_path)
+                if df is not None:
+                    span.set(rows=len(df), cached=True)
+                    self.loaded.emit(df, True)
+                    return
+                df = read_project(
+                    self.file_path,
+                    progress=self.progress.emit,
+                    is_cancelled=lambda: self._cancel_requested
+                )
+            except ImportCancelled:
+                span.set(cancelled=True)
+                self.cancelled.emit()
+            except Exception as e:
+                span.set(error=type(e).__name__)
+                self.failed.emit(str(e))
+            else:
+                span.set(rows=len(df), cached=False)
+                store_in_cache(self.cache, self.file_path, df)
+                self.loaded.emit(df, False)
+
+    def cancel(self):
+        """Запрашивает отмену; вызывается из GUI-потока"""
+        self._cancel_requested = True
+
+
+class PortfolioLoader(QObject):
+    """Фоновая загрузка нескольких файлов проектов и расчёт портфеля.
+
+    Файлы читаются по очереди через тот же кэш импорта, что и отдельные
+    проекты. Файл с ошибкой пропускается, остальные проекты загружаются.
+    """
+
+    progress = pyqtSignal("qint64", "qint64", "qint64")  # загружено файлов, всего файлов, прочитано этапов
+    loaded = pyqtSignal(object, list)     # Portfolio, ошибки «файл: сообщение»
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, file_paths, cache=None):
+        super().__init__()
+        self.file_paths = list(file_paths)
+        self.cache = cache
+        self._cancel_requested = False
+
+    def run(self):
+        with tracing.span("Импорт портфеля", files=len(self.file_paths)) as span:
+            try:
+                projects, errors = self.read_projects()
+                if not projects:
+                    raise ValueError("Не удалось загрузить ни одного проекта:\n" + "\n".join(errors))
+                with tracing.span("Расчёт портфеля", projects=len(projects)):
+                    portfolio = Portfolio(projects)
+            except ImportCancelled:
+                span.set(cancelled=True)
+                self.cancelled.emit()
+            except Exception as e:
+                span.set(error=type(e).__name__)
+                self.failed.emit(str(e))
+            else:
+                span.set(projects=len(portfolio), rows=portfolio.stage_count, errors=len(errors))
+                self.loaded.emit(portfolio, errors)
+
+    def read_projects(self):
+        """Список (имя, DataFrame) загруженных проектов и список ошибок"""
+        projects = []
+        errors = []
+        rows = 0
+        total = len(self.file_paths)
+        for done, (file_path, name) in enumerate(zip(self.file_paths, project_names(self.file_paths))):
+            if self._cancel_requested:
+                raise ImportCancelled()
+            self.progress.emit(done, total, rows)
+            try:
+                df = load_from_cache(self.cache, file_path)
+                if df is None:
+                    df = read_project(file_path, is_cancelled=lambda: self._cancel_requested)
+                    store_in_cache(self.cache, file_path, df)
+            except ImportCancelled:
+                raise
+            except Exception as e:
+                errors.append(f"{os.path.basename(file_path)}: {e}")
+                continue
+            projects.append((name, df))
+            rows += len(df)
+        self.progress.emit(total, total, rows)
+        return projects, errors
+
+    def cancel(self):
+        """Запрашивает отмену; вызывается из GUI-потока"""
+        self._cancel_requested = True
@@ -1,19 +1,25 @@
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QVBoxLayout,
-    QPushButton, QFileDialog, QTableWidget, QTableWidgetItem,
-    QTreeView, QHBoxLayout
+    QPushButton, QFileDialog, QTableView,
+    QTreeView, QHBoxLayout, QProgressBar
 )
 from PyQt5.QtWidgets import QMessageBox
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QStandardItemModel, QStandardItem
+from PyQt5.QtCore import Qt, QThread
 import pandas as pd
-import os
+from view.project_loader import ProjectLoader
+from view.project_dataset import parse_cell
+from view.import_cache import ImportCache
+from view.table_models import DataFrameModel, StageTreeModel
+from view import tracing
 
 
 class ProjectPage(QWidget):
     def __init__(self):
         super().__init__()
         self.data = None
+        self.loader = None
+        self.loader_thread = None
+        self.import_cache = ImportCache()
         self.init_ui()
 
     def init_ui(self):
@@ -31,11 +37,36 @@ class ProjectPage(QWidget):
         self.import_btn.setObjectName("menuButton")
         layout.addWidget(self.import_btn)
 
+        self.clear_cache_btn = QPushButton("🗑 Очистить кэш импорта")
+        self.clear_cache_btn.clicked.connect(self.clear_import_cache)
+        self.clear_cache_btn.setObjectName("menuButton")
+        self.clear_cache_btn.setEnabled(self.import_cache.enabled)
+        layout.addWidget(self.clear_cache_btn)
+
+        # Ход импорта: прогресс и отмена
+        progress_layout = QHBoxLayout()
+        self.import_progress = QProgressBar()
+        self.import_progress.setVisible(False)
+        progress_layout.addWidget(self.import_progress, stretch=1)
+
+        self.cancel_import_btn = QPushButton("✖ Отменить импорт")
+        self.cancel_import_btn.clicked.connect(self.cancel_import)
+        self.cancel_import_btn.setVisible(False)
+        progress_layout.addWidget(self.cancel_import_btn)
+        layout.addLayout(progress_layout)
+
+        self.import_status = QLabel("")
+        layout.addWidget(self.import_status)
+
         # Горизонтальный контейнер для таблицы и дерева
         content_layout = QHBoxLayout()
 
         # Таблица
-        self.table = QTableWidget()
+        self.table = QTableView()
+        # Правка ячейки пересчитывает только изменённый этап (edit_stage)
+        self.table_model = DataFrameModel(edit_handler=self.edit_stage)
+        self.table.setModel(self.table_model)
+        self.table.setSortingEnabled(True)
         self.table.setWordWrap(True)
         self.table.verticalHeader().setVisible(False)  # Скрыть первый (номерной) столбец
         self.table.horizontalHeader().setMinimumSectionSize(120)
@@ -46,8 +77,7 @@ class ProjectPage(QWidget):
 
         # Дерево этапов
         self.tree_view = QTreeView()
-        self.tree_model = QStandardItemModel()
-        self.tree_model.setHorizontalHeaderLabels(["Этапы проекта"])
+        self.tree_model = StageTreeModel("Этапы проекта")
         self.tree_view.setModel(self.tree_model)
         content_layout.addWidget(self.tree_view, stretch=1)
 
@@ -95,7 +125,7 @@ class ProjectPage(QWidget):
 
         # Применяем стиль для таблицы и дерева
         self.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background: #f8fafc;
                 border: 1px solid #e0e7ef;
                 border-radius: 10px;
@@ -106,10 +136,10 @@ class ProjectPage(QWidget):
                 gridline-color: #e0e7ef;
                 padding: 4px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: #b2ebf2;
                 color: #00796b;
             }
@@ -126,7 +156,7 @@ class ProjectPage(QWidget):
                 word-break: break-word;
                 white-space: normal;
             }
-            QTableWidget QHeaderView {
+            QTableView QHeaderView {
                 font-size: 15px;
             }
             QTreeView {
@@ -152,78 +182,134 @@ class ProjectPage(QWidget):
         """)
 
     def load_project(self):
+        if self.loader is not None:
+            return
+
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "Выберите файл проекта",
             "",
-            "Excel Files (*.xlsx);;CSV Files (*.csv);;JSON Files (*.json)"
+            "Excel Files (*.xlsx);;CSV Files (*.csv);;JSON Files (*.json);;JSON Lines (*.jsonl *.ndjson)"
         )
 
         if not file_path:
             return
 
-        try:
-            ext = os.path.splitext(file_path)[1].lower()
-            if ext == ".xlsx":
-                df = pd.read_excel(file_path)
-            elif ext == ".csv":
-                df = pd.read_csv(file_path)
-            elif ext == ".json":
-                df = pd.read_json(file_path)
-            else:
-                raise ValueError("Неподдерживаемый формат файла")
-
-            # Сохраняем данные
-            self.data = df
-
-            # Валидация структуры
-            required_columns = [
-                "Этап", "Ответственный", "Дата начала", "Дата окончания",
-                "Факт начала", "Факт окончания", "План. бюджет", "Факт. бюджет", "Ресурсы"
-            ]
-            missing = [col for col in required_columns if col not in df.columns]
-            if missing:
-                raise ValueError(f"Отсутствуют столбцы: {', '.join(missing)}")
-
-            # Обновить таблицу и дерево
+        # Чтение и валидация файла выполняются в отдельном потоке
+        self.loader_thread = QThread(self)
+        self.loader = ProjectLoader(file_path, self.import_cache)
+        self.loader.moveToThread(self.loader_thread)
+
+        self.loader_thread.started.connect(self.loader.run)
+        self.loader.progress.connect(self.on_import_progress)
+        self.loader.loaded.connect(self.on_import_loaded)
+        self.loader.failed.connect(self.on_import_failed)
+        self.loader.cancelled.connect(self.on_import_cancelled)
+        for signal in (self.loader.loaded, self.loader.failed, self.loader.cancelled):
+            signal.connect(self.loader_thread.quit)
+        self.loader_thread.finished.connect(self.loader.deleteLater)
+        self.loader_thread.finished.connect(self.loader_thread.deleteLater)
+
+        self.set_import_running(True)
+        self.import_status.setText("Импорт проекта...")
+        self.loader_thread.start()
+
+    def cancel_import(self):
+        if self.loader is not None:
+            self.loader.cancel()
+            self.cancel_import_btn.setEnabled(False)
+            self.import_status.setText("Отмена импорта...")
+
+    def set_import_running(self, running):
+        self.import_btn.setEnabled(not running)
+        self.clear_cache_btn.setEnabled(not running and self.import_cache.enabled)
+        self.import_progress.setVisible(running)
+        self.import_progress.setRange(0, 0)
+        self.cancel_import_btn.setVisible(running)
+        self.cancel_import_btn.setEnabled(running)
+        if not running:
+            self.loader = None
+            self.loader_thread = None
+
+    def on_import_progress(self, bytes_read, total_bytes, rows_read):
+        if bytes_read and total_bytes:
+            # Прогресс в килобайтах, чтобы не выйти за пределы int
+            self.import_progress.setRange(0, max(total_bytes // 1024, 1))
+            self.import_progress.setValue(bytes_read // 1024)
+        self.import_status.setText(
+            f"Прочитано строк: {rows_read} "
+            f"({bytes_read / 1048576:.1f} из {total_bytes / 1048576:.1f} МБ)"
+        )
+
+    def on_import_loaded(self, df, from_cache):
+        self.set_import_running(False)
+        source = " (из кэша)" if from_cache else ""
+        self.show_project(df, f"Загружено этапов: {len(df)}{source}")
+
+        # Передаём данные остальным страницам только после завершения разбора
+        self.window().set_project_data(df)
+
+    def show_project(self, df, status):
+        """Показывает этапы проекта (импортированного или выбранного в портфеле)"""
+        self.import_status.setText(status)
+
+        # Сохраняем данные
+        self.data = df
+
+        # Обновить таблицу и дерево
+        with tracing.span("Таблица и дерево проекта", rows=len(df)):
             self.update_table(df)
             self.update_tree(df)
 
-        except Exception as e:
-            from PyQt5.QtWidgets import QMessageBox
-            QMessageBox.critical(self, "Ошибка", str(e))
-
-    def update_table(self, df):
-        self.table.setRowCount(df.shape[0])
-        self.table.setColumnCount(df.shape[1])
-        self.table.setHorizontalHeaderLabels(df.columns)
+    def on_import_failed(self, message):
+        self.set_import_running(False)
+        self.import_status.setText("")
+        QMessageBox.critical(self, "Ошибка", message)
 
-        for i in range(df.shape[0]):
-            for j in range(df.shape[1]):
-                item = QTableWidgetItem(str(df.iat[i, j]))
-                self.table.setItem(i, j, item)
+    def on_import_cancelled(self):
+        self.set_import_running(False)
+        self.import_status.setText("Импорт отменён.")
 
-    def update_tree(self, df):
-        self.tree_model.clear()
-        self.tree_model.setHorizontalHeaderLabels(["Этапы проекта"])
+    def clear_import_cache(self):
+        freed = self.import_cache.clear()
+        QMessageBox.information(
+            self, "Кэш импорта", f"Кэш очищен, освобождено {freed / 1048576:.1f} МБ."
+        )
 
-        root_item = self.tree_model.invisibleRootItem()
+    def apply_changes(self, dataset, changes):
+        """Обновляет таблицу и дерево после изменения части этапов"""
+        self.data = dataset.raw
+        self.table_model.apply_changes(dataset.raw, changes)
+        self.update_tree(dataset.raw)
 
-        for _, row in df.iterrows():
-            stage = QStandardItem(row["Этап"])
-            responsible = QStandardItem(f"Ответственный: {row['Ответственный']}")
-            duration = QStandardItem(f"Срок: {row['Дата начала']} – {row['Дата окончания']}")
-            budget = QStandardItem(f"Бюджет: {row['План. бюджет']} руб.")
+    def edit_stage(self, position, column, text):
+        """Применяет правку ячейки таблицы: производные столбцы, метрики
+        и рекомендации пересчитываются только для этого этапа"""
+        window = self.window()
+        dataset = window.get_dataset()
+        if dataset is None or position >= len(dataset):
+            return False
+        try:
+            value = parse_cell(column, text)
+        except ValueError as e:
+            self.import_status.setText(f"Значение не изменено: {e}")
+            return False
+        label = dataset.frame.index[position]
+        window.apply_project_changes(updated=pd.DataFrame({column: [value]}, index=[label]))
+        self.import_status.setText(f"Изменён этап «{dataset.frame['Этап'].iloc[position]}»: {column}")
+        return True
 
-            stage.appendRow(responsible)
-            stage.appendRow(duration)
-            stage.appendRow(budget)
+    def update_table(self, df):
+        # Ячейки форматируются моделью только при отображении
+        self.table_model.set_frame(df)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
 
-            root_item.appendRow(stage)
+    def update_tree(self, df):
+        # Детали этапа формируются моделью только при раскрытии узла
+        self.tree_model.set_frame(df)
 
     def goto_analysis(self):
         if self.data is not None:
-            self.window().set_project_data(self.data)  # Обновляем данные для всех страниц
-            self.window().switch_page("Анализ")
+            self.window().switch_page("Анализ")  # Данные переданы страницам при импорте
         else:
             QMessageBox.warning(self, "Ошибка", "Сначала загрузите данные проекта.")
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import operator
+import os
+import numpy as np
+import pandas as pd
+from view.project_dataset import StageChanges
+from view import tracing
+
+
+# Поля текста рекомендации в порядке столбцов таблицы
+TEXT_FIELDS = ["Проблема", "Причина", "Рекомендация", "Ожидаемый эффект"]
+
+# База правил по умолчанию — рядом с модулем, как и база знаний по времени
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "knowledge_base_rules.json")
+
+OPERATORS = {
+    ">": operator.gt, ">=": operator.ge,
+    "<": operator.lt, "<=": operator.le,
+    "==": operator.eq, "!=": operator.ne,
+}
+
+# Скомпилированные базы правил: путь -> (время изменения файла, RuleBase)
+_rules_cache = {}
+
+
+def compile_condition(condition):
+    """Условие {"column", "op", "value"} -> функция от массивов столбцов"""
+    op = OPERATORS.get(condition.get("op"))
+    if op is None:
+        raise ValueError(f"Неизвестная операция «{condition.get('op')}» в базе правил")
+    column, value = condition["column"], condition["value"]
+    return lambda arrays: op(arrays[column], value)
+
+
+def compile_conditions(conditions):
+    """Конъюнкция условий правила -> одна булева маска по всем этапам"""
+    parts = [compile_condition(condition) for condition in conditions]
+
+    def predicate(arrays):
+        mask = parts[0](arrays)
+        for part in parts[1:]:
+            mask = mask & part(arrays)
+        return mask
+    return predicate
+
+
+class RuleBase:
+    """Скомпилированная база правил.
+
+    Правила разбиты на группы (сроки, бюджет, ...): в группе срабатывает
+    первое подходящее правило, правило без условий срабатывает всегда.
+    Код категории — индекс правила в categories; digest — хэш описания базы.
+    """
+
+    def __init__(self, spec):
+        self.digest = hashlib.sha1(
+            json.dumps(spec, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        self.categories = []
+        self.groups = []  # (столбец значения, [(предикат, код)], код по умолчанию)
+        self.columns = []
+        for group in spec["groups"]:
+            self.add_column(group["value"])
+            predicates = []
+            default = -1
+            for rule in group["rules"]:
+                code = len(self.categories)
+                self.categories.append({field: rule.get(field, "") for field in TEXT_FIELDS})
+                conditions = rule.get("when", [])
+                if not conditions:
+                    default = code
+                    break  # следующие правила группы недостижимы
+                for condition in conditions:
+                    self.add_column(condition["column"])
+                predicates.append((compile_conditions(conditions), code))
+            self.groups.append((group["value"], predicates, default))
+
+    def add_column(self, column):
+        if column not in self.columns:
+            self.columns.append(column)
+
+
+def read_spec(path):
+    """Читает описание базы правил из JSON или YAML"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            import yaml  # необязательная зависимость, нужна только для YAML
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def load_rules(path=DEFAULT_RULES_PATH):
+    """Возвращает скомпилированную базу правил; перечитывает файл только после его изменения"""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _rules_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with tracing.span("Компиляция правил", file=os.path.basename(path)) as span:
+        rules = RuleBase(read_spec(path))
+        span.set(rules=len(rules.categories))
+    _rules_cache[path] = (mtime, rules)
+    return rules
+
+
+def column_values(series):
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype="float64")
+    return series.to_numpy()
+
+
+@tracing.traced("Правила рекомендаций")
+def evaluate(df, rules=None):
+    """Применяет правила ко всем этапам: одна операция над столбцом на условие.
+
+    Возвращает компактную таблицу: stage — позиция этапа в df, code — код
+    категории (правила), value — значение показателя группы. На этап
+    приходится не более одной строки на группу, в порядке групп базы правил.
+    """
+    rules = rules or load_rules()
+    missing = [col for col in rules.columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"В данных нет столбцов, используемых в правилах: {', '.join(missing)}")
+    arrays = {col: column_values(df[col]) for col in rules.columns}
+
+    # Сравнения с NaN ложны, поэтому такие этапы получают правило по умолчанию
+    # (или не получают рекомендации группы) — как и в цепочке if/elif
+    group_codes = []
+    with np.errstate(invalid="ignore"):
+        for _, predicates, default in rules.groups:
+            if predicates:
+                group_codes.append(np.select(
+                    [predicate(arrays) for predicate, _ in predicates],
+                    [code for _, code in predicates],
+                    default=default
+                ))
+            else:
+                group_codes.append(np.full(len(df), default))
+
+    if not group_codes:
+        return pd.DataFrame({"stage": [], "code": [], "value": []})
+    codes = np.column_stack(group_codes)
+    values = np.column_stack([arrays[value_column] for value_column, _, _ in rules.groups])
+    mask = codes >= 0
+    # nonzero обходит матрицу по строкам — порядок «этап, затем группа» сохраняется
+    stage, _ = np.nonzero(mask)
+    return pd.DataFrame({
+        "stage": stage.astype("int64"),
+        "code": codes[mask].astype("int16"),
+        "value": values[mask].astype("float64"),
+    })
+
+
+def evaluate_changes(result, df, changes, rules=None):
+    """Пересчитывает рекомендации только для изменённых и добавленных этапов.
+
+    result — прежняя компактная таблица, df — таблица этапов после изменений,
+    changes — StageChanges этапов. Рекомендации остальных этапов переиспользуются.
+    Возвращает новую таблицу и StageChanges для строк таблицы рекомендаций.
+    """
+    rules = rules or load_rules()
+    old_stage = result["stage"].to_numpy()
+    removed_stage = np.isin(old_stage, changes.removed)
+    # Позиции этапов после удаления строк
+    shifted = old_stage - np.searchsorted(changes.removed, old_stage)
+    dropped = removed_stage | np.isin(shifted, changes.updated)
+
+    kept = result.loc[~dropped].copy()
+    kept["stage"] = shifted[~dropped]
+
+    targets = np.concatenate([changes.updated, changes.inserted]).astype("int64")
+    fresh = evaluate(df.iloc[targets], rules)
+    fresh["stage"] = targets[fresh["stage"].to_numpy()]
+    if "Этап" in result.columns:
+        with_stage_names(fresh, df["Этап"])
+
+    # Пустая часть при склейке сбросила бы тип столбца «Этап» до object
+    parts = [part for part in (kept, fresh) if len(part)] or [kept]
+    combined = pd.concat(parts, ignore_index=True)
+    # Строки одного этапа либо все сохранены, либо все пересчитаны, поэтому
+    # устойчивая сортировка по этапу сохраняет порядок групп внутри этапа
+    order = np.argsort(combined["stage"].to_numpy(), kind="stable")
+    is_fresh = np.arange(len(combined))[order] >= len(kept)
+    return (
+        combined.take(order).reset_index(drop=True),
+        StageChanges(np.nonzero(dropped)[0], [], np.nonzero(is_fresh)[0])
+    )
+
+
+def render(code, value, field, rules=None):
+    """Текст поля рекомендации для одной строки компактной таблицы"""
+    rules = rules or load_rules()
+    return rules.categories[code][field].format(value=value, half=value * 0.5, neg=-value)
+
+
+def text_accessor(result, field, rules=None):
+    """Функция чтения текста поля по позиции строки; текст формируется по запросу"""
+    rules = rules or load_rules()
+    codes = result["code"].to_numpy()
+    values = result["value"].to_numpy()
+    return lambda row: render(codes[row], values[row], field, rules)
+
+
+def with_stage_names(result, stages):
+    """Добавляет к компактной таблице столбец «Этап» с названиями этапов"""
+    result["Этап"] = stages.to_numpy()[result["stage"].to_numpy()]
+    return result
+
+
+@tracing.traced("Текст рекомендаций")
+def to_rows(result, fields=TEXT_FIELDS, rules=None):
+    """Полные строки рекомендаций [этап, поля...] — для отчётов"""
+    rules = rules or load_rules()
+    return [
+        [str(stage)] + [render(code, value, field, rules) for field in fields]
+        for stage, code, value in zip(result["Этап"], result["code"], result["value"])
+    ]
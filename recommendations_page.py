@@ -1,14 +1,27 @@
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QVBoxLayout,
-    QPushButton, QTableWidget, QTableWidgetItem, QFrame
+    QPushButton, QTableView, QHeaderView
 )
 from PyQt5.QtCore import Qt
+from view.table_models import DataFrameModel
+from view import recommendation_engine, tracing
+
+
+RECOMMENDATION_COLUMNS = ["Этап", "Проблема", "Причина", "Рекомендация", "Ожидаемый эффект"]
+
+# Выше этого числа строк высота подбирается не по содержимому, а фиксированно:
+# подбор по содержимому форматирует и измеряет каждую ячейку таблицы
+AUTO_ROW_HEIGHT_LIMIT = 1000
+FIXED_ROW_HEIGHT = 120
 
 
 class RecommendationsPage(QWidget):
     def __init__(self):
         super().__init__()
-        self.calculations_data = None  # данные из CalculationsPage
+        self.calculations_data = None  # рассчитанные метрики общего набора данных
+        self.data_version = None  # версия набора данных, к которой относятся рекомендации
+        self.recommendations_data = None  # сформированные рекомендации
+        self.rules = None  # база правил, по которой они сформированы
         self.init_ui()
 
     def init_ui(self):
@@ -65,14 +78,49 @@ class RecommendationsPage(QWidget):
         self.generate_btn.clicked.connect(self.show_recommendations)
         layout.addWidget(self.generate_btn)
 
-        self.table = QTableWidget()
+        self.table = QTableView()
+        # Тексты рекомендаций формируются только для отображаемых ячеек
+        self.table_model = DataFrameModel(
+            columns=RECOMMENDATION_COLUMNS,
+            computed={
+                field: (lambda frame, field=field: recommendation_engine.text_accessor(frame, field, self.rules))
+                for field in recommendation_engine.TEXT_FIELDS
+            }
+        )
+        self.table.setModel(self.table_model)
+        self.table.setWordWrap(True)
         layout.addWidget(self.table)
 
         self.setLayout(layout)
 
-    def set_calculations(self, calculations_data):
-        """Получаем данные из раздела 'Рассчитанные значения'"""
-        self.calculations_data = calculations_data
+    def set_data(self, dataset):
+        if dataset is not None and dataset.version == self.data_version:
+            return  # этот набор данных уже обработан
+        self.data_version = dataset.version if dataset is not None else None
+        # ΔT, ΔC и E уже рассчитаны в общем наборе данных
+        self.calculations_data = dataset.frame if dataset is not None and dataset.dates_valid else None
+        if self.recommendations_data is not None:
+            # Рекомендации по прежним данным устарели
+            self.table_model.set_frame(None)
+            self.recommendations_data = None
+            self.description.setText(
+                "Данные проекта изменились. Нажмите [Сгенерировать рекомендации], чтобы обновить предложения."
+            )
+
+    def apply_changes(self, dataset, changes):
+        """Пересчитывает рекомендации только для изменённых этапов"""
+        if not dataset.dates_valid:
+            return  # набор данных будет обработан заново при показе страницы
+        self.data_version = dataset.version
+        self.calculations_data = dataset.frame
+        if self.recommendations_data is None or self.rules is None:
+            return  # рекомендации ещё не сформированы
+        result, row_changes = recommendation_engine.evaluate_changes(
+            self.recommendations_data, dataset.frame, changes, self.rules
+        )
+        self.recommendations_data = result
+        self.table_model.apply_changes(result, row_changes)
+        self.description.setText(f"Сформировано {len(result)} рекомендаций.")
 
     def show_recommendations(self):
         if self.calculations_data is None or self.calculations_data.empty:
@@ -80,191 +128,42 @@ class RecommendationsPage(QWidget):
             QMessageBox.warning(self, "Ошибка", "Нет данных для формирования рекомендаций")
             return
 
-        df = self.calculations_data.copy()
-
-        # Преобразуем ΔT и ΔC из строк с "%" в числа
-        try:
-            df["ΔT"] = df["ΔT"].str.replace(" %", "").astype(float)
-            df["ΔC"] = df["ΔC"].str.replace(" %", "").astype(float)
-        except Exception as e:
-            from PyQt5.QtWidgets import QMessageBox
-            QMessageBox.critical(self, "Ошибка", f"Ошибка обработки данных: {str(e)}")
-            return
+        # ΔT и ΔC хранятся числами (float64), преобразование не требуется
+        df = self.calculations_data
 
         # Очищаем таблицу
-        self.table.setRowCount(0)
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["Этап", "Проблема", "Причина", "Рекомендация", "Ожидаемый эффект"])
-
-        # Генерируем рекомендации
-        recommendations = []
-
-        for i in range(len(df)):
-            stage = df.iloc[i]["Этап"]
-            delta_t = df.iloc[i]["ΔT"]  # Отклонение по времени в %
-            delta_c = df.iloc[i]["ΔC"]  # Перерасход бюджета в %
-            e = df.iloc[i]["E"]         # Эффективность ресурсов
-            reason = ""
-            recommendation = ""
-            effect = ""
-            problem = ""
-            # Проблема по срокам
-            if delta_t > 10:
-                problem = f"Задержка по срокам: превышение на {delta_t:.2f}% от плана"
-                reason = "Значительное превышение сроков выполнения этапа. Возможные причины: нехватка ресурсов, задержки поставок, ошибки в планировании."
-                recommendation = (
-                    "Провести анализ причин задержки: проверить наличие всех необходимых ресурсов, "
-                    "оценить работу поставщиков, пересмотреть план-график. Рассмотреть возможность привлечения "
-                    "дополнительных исполнителей или перераспределения задач между сотрудниками."
-                )
-                effect = f"Ожидаемое сокращение задержки: с {delta_t:.2f}% до {delta_t*0.5:.2f}%"
-                recommendations.append([
-                    str(stage),
-                    problem,
-                    reason,
-                    recommendation,
-                    effect
-                ])
-            elif 0 < delta_t <= 10:
-                problem = f"Небольшая задержка: превышение на {delta_t:.2f}% от плана"
-                reason = "Небольшое превышение сроков. Возможные причины: незначительные организационные сбои, погодные условия, неэффективное распределение задач."
-                recommendation = (
-                    "Провести оперативное совещание с командой, скорректировать приоритеты, "
-                    "при необходимости временно увеличить рабочее время или привлечь дополнительные ресурсы."
-                )
-                effect = f"Ожидаемое сокращение задержки: с {delta_t:.2f}% до {delta_t*0.5:.2f}%"
-                recommendations.append([
-                    str(stage),
-                    problem,
-                    reason,
-                    recommendation,
-                    effect
-                ])
-            elif delta_t < 0:
-                problem = f"Опережение графика: выполнение быстрее на {-delta_t:.2f}%"
-                reason = "Работы выполнены с опережением графика. Возможные причины: высокая мотивация персонала, оптимизация процессов."
-                recommendation = (
-                    "Зафиксировать успешные практики, поощрить команду, рассмотреть возможность перераспределения "
-                    "освободившихся ресурсов на другие этапы или проекты."
-                )
-                effect = f"Потенциал ускорения других этапов: до {-delta_t:.2f}%"
-                recommendations.append([
-                    str(stage),
-                    problem,
-                    reason,
-                    recommendation,
-                    effect
-                ])
-            # Проблема по бюджету
-            if delta_c > 10:
-                problem = f"Перерасход бюджета: превышение на {delta_c:.2f}% от плана"
-                reason = "Существенный перерасход бюджета. Возможные причины: рост цен, дополнительные работы, ошибки в смете."
-                recommendation = (
-                    "Провести детальный анализ затрат, выявить статьи перерасхода, согласовать корректировку бюджета с руководством. "
-                    "Проверить договоры с поставщиками, рассмотреть альтернативные варианты закупок."
-                )
-                effect = f"Ожидаемое снижение перерасхода: с {delta_c:.2f}% до {delta_c*0.5:.2f}%"
-                recommendations.append([
-                    str(stage),
-                    problem,
-                    reason,
-                    recommendation,
-                    effect
-                ])
-            elif 0 < delta_c <= 10:
-                problem = f"Умеренный перерасход бюджета: превышение на {delta_c:.2f}% от плана"
-                reason = "Умеренный перерасход бюджета. Возможные причины: незначительные дополнительные расходы, корректировки в процессе."
-                recommendation = (
-                    "Провести сверку сметы, оптимизировать закупки, пересмотреть условия договоров, "
-                    "контролировать расходы на следующих этапах."
-                )
-                effect = f"Ожидаемое снижение перерасхода: с {delta_c:.2f}% до {delta_c*0.5:.2f}%"
-                recommendations.append([
-                    str(stage),
-                    problem,
-                    reason,
-                    recommendation,
-                    effect
-                ])
-            elif delta_c < 0:
-                problem = f"Экономия бюджета: снижение затрат на {-delta_c:.2f}% от плана"
-                reason = "Экономия бюджета. Возможные причины: скидки, оптимизация закупок, эффективное управление."
-                recommendation = (
-                    "Зафиксировать успешные решения, рассмотреть возможность перераспределения сэкономленных средств "
-                    "на другие этапы или проекты."
-                )
-                effect = f"Потенциал экономии: {-delta_c:.2f}%"
-                recommendations.append([
-                    str(stage),
-                    problem,
-                    reason,
-                    recommendation,
-                    effect
-                ])
-            # Проблема по эффективности
-            if e < -0.1:
-                problem = f"Низкая эффективность ресурсов: показатель {e:.2f} (ниже нормы)"
-                reason = "Низкая эффективность использования ресурсов. Возможные причины: простаивание техники, неравномерная загрузка персонала."
-                recommendation = (
-                    "Провести аудит загрузки ресурсов, выявить и устранить узкие места, "
-                    "перепланировать график работ для равномерного распределения нагрузки."
-                )
-                effect = "Ожидаемый рост эффективности: до нормы"
-                recommendations.append([
-                    str(stage),
-                    problem,
-                    reason,
-                    recommendation,
-                    effect
-                ])
-            elif e > 0.1:
-                problem = f"Высокая эффективность ресурсов: показатель {e:.2f} (выше нормы)"
-                reason = "Высокая эффективность использования ресурсов. Возможные причины: грамотное планирование, автоматизация процессов."
-                recommendation = (
-                    "Использовать выявленные эффективные подходы на других этапах, "
-                    "поощрить команду, внедрять лучшие практики в будущих проектах."
-                )
-                effect = "Возможность тиражирования успешных практик"
-                recommendations.append([
-                    str(stage),
-                    problem,
-                    reason,
-                    recommendation,
-                    effect
-                ])
+        self.table_model.set_frame(None)
+        self.recommendations_data = None
+
+        # Правила базы знаний компилируются один раз и перечитываются только
+        # после изменения файла; каждое условие — одна операция над столбцом.
+        # Диалоги показываются после спана, чтобы их время не попало в трассировку
+        error = None
+        result = None
+        with tracing.span("Формирование рекомендаций", stages=len(df)) as span:
+            try:
+                self.rules = recommendation_engine.load_rules()
+                result = recommendation_engine.evaluate(df, self.rules)
+            except Exception as e:
+                error = e
+                span.set(error=type(e).__name__)
             else:
-                problem = f"Эффективность ресурсов в норме: показатель {e:.2f}"
-                reason = "Эффективность ресурсов в пределах нормы."
-                recommendation = "Действия не требуются. Продолжать работу по текущему плану."
-                effect = "Стабильная работа, изменений не требуется"
-                recommendations.append([
-                    str(stage),
-                    problem,
-                    reason,
-                    recommendation,
-                    effect
-                ])
+                span.set(rows=len(result))
+                if not result.empty:
+                    with tracing.span("Таблица рекомендаций", rows=len(result)):
+                        self.update_table(recommendation_engine.with_stage_names(result, df["Этап"]))
 
-        if not recommendations:
+        if error is not None:
+            from PyQt5.QtWidgets import QMessageBox
+            QMessageBox.critical(self, "Ошибка", f"Ошибка базы правил: {str(error)}")
+        elif result.empty:
             from PyQt5.QtWidgets import QMessageBox
             QMessageBox.information(self, "Информация", "Рекомендации отсутствуют.")
-            return
-
-        self.update_table(recommendations)
 
     def update_table(self, recommendations):
-        """Обновляет таблицу рекомендаций"""
-        self.table.clear()  # Очищаем полностью, чтобы сбросить старые заголовки
-        self.table.setRowCount(len(recommendations))
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels([
-            "Этап", "Проблема", "Причина", "Рекомендация", "Ожидаемый эффект"
-        ])
-
-        for i, row in enumerate(recommendations):
-            for j, val in enumerate(row):
-                item = QTableWidgetItem(str(val))
-                self.table.setItem(i, j, item)
+        """Обновляет таблицу рекомендаций (компактная таблица движка рекомендаций)"""
+        self.recommendations_data = recommendations
+        self.table_model.set_frame(recommendations)
 
         # Устанавливаем фиксированную ширину столбцов
         self.table.setColumnWidth(0, 180)  # Этап
@@ -308,8 +207,10 @@ class RecommendationsPage(QWidget):
         """)
 
         # Запрещаем растягивание столбцов пользователем
-        from PyQt5.QtWidgets import QHeaderView
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
-        self.table.resizeRowsToContents()
+        if len(recommendations) <= AUTO_ROW_HEIGHT_LIMIT:
+            self.table.resizeRowsToContents()
+        else:
+            self.table.verticalHeader().setDefaultSectionSize(FIXED_ROW_HEIGHT)
         self.description.setText(f"Сформировано {len(recommendations)} рекомендаций.")
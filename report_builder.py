@@ -0,0 +1,323 @@
+import io
+import itertools
+import re
+from contextlib import contextmanager
+from xml.sax.saxutils import escape
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.oxml.shape import CT_Inline
+from docx.shared import Inches
+from view.formatting import METRIC_FORMATTERS, format_value
+from view import charts, recommendation_engine, report_cache, tracing
+
+
+# Столбцы раздела рассчитанных метрик
+METRIC_COLUMNS = ["Этап", "ΔT", "ΔC", "E"]
+
+# Поля рекомендаций, попадающие в отчёт
+REPORT_FIELDS = ["Проблема", "Рекомендация"]
+
+# Этапы формирования отчёта — одинаковые для Word и PDF
+REPORT_SECTIONS = ["Данные проекта", "Рассчитанные метрики", "Рекомендации", "Графики", "Сохранение"]
+
+# Управляющие символы: недопустимые в XML удаляются, \t и \n становятся w:tab и w:br
+CONTROL_CHARS = re.compile(r"[\x00-\x1f]")
+INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def project_metrics(dataset):
+    """Рассчитанные метрики набора данных или None, если даты некорректны"""
+    return dataset.frame if dataset.dates_valid else None
+
+
+def project_recommendations(calc_data, rules=None):
+    """Компактная таблица рекомендаций с названиями этапов или None, если метрик нет"""
+    if calc_data is None or calc_data.empty:
+        return None
+    result = recommendation_engine.evaluate(calc_data, rules)
+    return recommendation_engine.with_stage_names(result, calc_data["Этап"])
+
+
+class ReportCancelled(Exception):
+    """Формирование отчёта отменено пользователем"""
+
+
+class ReportProgress:
+    """Ход формирования отчёта по этапам REPORT_SECTIONS.
+
+    callback(этап, выполнено, всего) вызывается в начале и в конце этапа,
+    а для длинных таблиц — и по ходу записи. is_cancelled() проверяется
+    перед каждым этапом и между страницами таблиц. Каждый этап — спан трассировки.
+    """
+
+    def __init__(self, callback=None, is_cancelled=None):
+        self.callback = callback
+        self.is_cancelled = is_cancelled
+        self.index = None
+
+    @contextmanager
+    def section(self, index):
+        self.check_cancelled()
+        self.index = index
+        self.report(0, 1)
+        with tracing.span(REPORT_SECTIONS[index]) as span:
+            yield span
+        self.report(1, 1)
+
+    def report(self, done, total):
+        if self.callback is not None:
+            self.callback(self.index, done, total)
+
+    def check_cancelled(self):
+        if self.is_cancelled is not None and self.is_cancelled():
+            raise ReportCancelled()
+
+
+class ReportSnapshot:
+    """Данные разделов отчёта, снятые до начала его формирования.
+
+    recommendations — компактная таблица рекомендаций, rules — база правил,
+    по которой она сформирована; текст рекомендаций формируется уже при записи.
+    Копии поверхностные: при Copy-on-Write (включён в project_io) последующие
+    изменения проекта не затрагивают снимок, поэтому с проектом можно продолжать работать.
+    """
+
+    def __init__(self, project_data, calc_data, recommendations=None, rules=None):
+        self.project_data = project_data.copy(deep=False) if project_data is not None else None
+        self.calc_data = calc_data.copy(deep=False) if calc_data is not None else None
+        self.recommendations = recommendations.copy(deep=False) if recommendations is not None else None
+        self.rules = rules
+        self.keys = {}
+
+    def key(self, part):
+        """Хэш входных данных части отчёта: "project", "metrics", "recommendations" или "charts".
+
+        Считается при первом обращении (уже в потоке формирования отчёта);
+        None — часть отсутствует или её данные не хэшируются.
+        """
+        if part not in self.keys:
+            self.keys[part] = self.compute_key(part)
+        return self.keys[part]
+
+    def compute_key(self, part):
+        if part == "project":
+            return report_cache.frame_key(self.project_data)
+        if self.calc_data is None:
+            return None
+        if part == "metrics":
+            return report_cache.frame_key(self.calc_data[METRIC_COLUMNS])
+        if part == "charts":
+            return report_cache.frame_key(
+                self.calc_data[[col for col in charts.CHART_COLUMNS if col in self.calc_data.columns]]
+            )
+        if part == "recommendations" and self.recommendations is not None:
+            key = report_cache.frame_key(self.recommendations[["Этап", "code", "value"]])
+            rules = self.rules or recommendation_engine.load_rules()
+            return f"{key}:{rules.digest}" if key is not None else None
+        return None
+
+    def rows(self, part):
+        """Число строк таблицы данных проекта ("project") или метрик ("metrics")"""
+        frame = self.project_data if part == "project" else self.calc_data
+        return len(frame) if frame is not None else 0
+
+    def recommendation_rows(self):
+        """Строки рекомендаций для отчёта; общие для Word и PDF"""
+        if self.recommendations is None:
+            return []
+        key = self.key("recommendations")
+        return report_cache.sections.get_or_build(
+            ("rows", "recommendations", key) if key is not None else None,
+            lambda: recommendation_engine.to_rows(self.recommendations, REPORT_FIELDS, self.rules)
+        )
+
+
+def run_xml(text):
+    """Разметка w:r для текста ячейки — как при записи cell.text в python-docx"""
+    if not text:
+        return "<w:r/>"
+    if CONTROL_CHARS.search(text) is None:
+        return f'<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+    parts = []
+    for i, line in enumerate(INVALID_XML_CHARS.sub("", text).replace("\r", "").split("\n")):
+        if i:
+            parts.append("<w:br/>")
+        for j, piece in enumerate(line.split("\t")):
+            if j:
+                parts.append("<w:tab/>")
+            if piece:
+                parts.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+    return f"<w:r>{''.join(parts)}</w:r>"
+
+
+def table_markup(widths, headers, columns):
+    """Разметка строк таблицы (w:tr) в UTF-8 — вдвое компактнее строки с кириллицей"""
+    openings = [f'<w:tc><w:tcPr><w:tcW w:w="{w}" w:type="dxa"/></w:tcPr><w:p>' for w in widths]
+    parts = []
+    for row in itertools.chain([headers], zip(*columns)):
+        parts.append("<w:tr>")
+        for opening, text in zip(openings, row):
+            parts.append(opening)
+            parts.append(run_xml(text))
+            parts.append("</w:p></w:tc>")
+        parts.append("</w:tr>")
+    return "".join(parts).encode("utf-8")
+
+
+def add_table(doc, headers, columns):
+    """Таблица «Table Grid» из столбцов строковых значений"""
+    return add_cached_table(doc, headers, lambda: columns)
+
+
+def add_cached_table(doc, headers, build_columns, cache_key=None):
+    """Таблица «Table Grid»; build_columns() возвращает столбцы строковых значений.
+
+    Разметка всех строк собирается одной строкой и разбирается за один вызов
+    парсера — без прокси-объектов python-docx для каждой ячейки. С cache_key
+    разметка берётся из кэша разделов, а столбцы строятся только при промахе.
+    """
+    table = doc.add_table(rows=0, cols=len(headers))
+    table.style = "Table Grid"
+    widths = [col.w.twips for col in table._tbl.tblGrid.gridCol_lst]
+    markup = report_cache.sections.get_or_build(
+        cache_key + tuple(widths) if cache_key is not None else None,
+        lambda: table_markup(widths, headers, build_columns())
+    )
+    rows = parse_xml(b"".join([f"<w:tbl {nsdecls('w')}>".encode("ascii"), markup, b"</w:tbl>"]))
+    table._tbl.extend(list(rows))
+    return table
+
+
+def section_key(kind, key):
+    """Ключ раздела в кэше или None, если входные данные не хэшируются"""
+    return ("docx", kind, key) if key is not None else None
+
+
+def project_columns(project_data):
+    """Столбцы данных проекта строками — одинаково для отчётов Word и PDF"""
+    return [[format_value(val) for val in project_data[col].tolist()] for col in project_data.columns]
+
+
+def metric_columns(calc_data):
+    """Столбцы METRIC_COLUMNS строками — одинаково для отчётов Word и PDF"""
+    return [
+        [METRIC_FORMATTERS.get(col, format_value)(val) for val in calc_data[col].tolist()]
+        for col in METRIC_COLUMNS
+    ]
+
+
+def add_project_section(doc, project_data, key=None):
+    if project_data is None:
+        doc.add_paragraph("Данные проекта отсутствуют.")
+        return
+    doc.add_heading("1. Данные проекта", level=1)
+    add_cached_table(
+        doc, [str(col) for col in project_data.columns],
+        lambda: project_columns(project_data),
+        section_key("project", key)
+    )
+
+
+def add_metrics_section(doc, calc_data, key=None):
+    if calc_data is None:
+        doc.add_paragraph("Рассчитанные метрики отсутствуют.")
+        return
+    doc.add_heading("2. Рассчитанные метрики", level=1)
+    add_cached_table(
+        doc, METRIC_COLUMNS, lambda: metric_columns(calc_data),
+        section_key("metrics", key)
+    )
+
+
+def add_recommendations_section(doc, recommendations, key=None):
+    if not recommendations:
+        doc.add_paragraph("Рекомендации отсутствуют.")
+        return
+    doc.add_heading("3. Рекомендации", level=1)
+    add_cached_table(
+        doc, ["Этап"] + REPORT_FIELDS, lambda: list(zip(*recommendations)),
+        section_key("recommendations", key)
+    )
+
+
+def add_picture(doc, image, width, shape_id):
+    """Рисунок в новом абзаце с заданным идентификатором фигуры.
+
+    doc.add_picture ищет свободный идентификатор запросом //@id по всему
+    документу; на отчётах в сотни тысяч строк таблиц lxml на нём падает.
+    """
+    part = doc.part
+    rId, picture = part.get_or_add_image(image)
+    cx, cy = picture.scaled_dimensions(width, None)
+    run = doc.add_paragraph().add_run()
+    run._r.add_drawing(CT_Inline.new_pic_inline(shape_id, rId, picture.filename, cx, cy))
+
+
+def add_charts_section(doc, charts, first_shape_id=None):
+    """Раздел графиков; first_shape_id — первый свободный идентификатор фигуры.
+
+    Разметка таблиц отчёта не содержит атрибутов id, поэтому идентификатор,
+    взятый у документа до добавления таблиц, остаётся свободным.
+    """
+    if not charts:
+        doc.add_paragraph("Графики отсутствуют.")
+        return
+    if first_shape_id is None:
+        first_shape_id = doc.part.next_id
+    doc.add_heading("4. Графики", level=1)
+    for shape_id, (chart_name, chart_image) in enumerate(charts, first_shape_id):
+        doc.add_paragraph(chart_name)
+        add_picture(doc, chart_image, Inches(5.5), shape_id)
+
+
+def chart_images(calc_data, key=None, chart_types=charts.EXPORT_CHARTS, parallel=True):
+    """Изображения графиков [(тип графика, BytesIO)]; строятся только отсутствующие в кэше"""
+    keys = {
+        chart_type: ("png", chart_type, key, charts.chart_source(chart_type)) if key is not None else None
+        for chart_type in chart_types
+    }
+    images = {chart_type: report_cache.sections.get(keys[chart_type]) for chart_type in chart_types}
+    missing = [chart_type for chart_type in chart_types if images[chart_type] is None]
+    if missing:
+        for chart_type, image in charts.export_charts(calc_data, missing, parallel=parallel):
+            images[chart_type] = image.getvalue()
+            report_cache.sections.put(keys[chart_type], images[chart_type])
+    return [(chart_type, io.BytesIO(images[chart_type])) for chart_type in chart_types]
+
+
+def new_report():
+    doc = Document()
+    doc.add_heading("Отчёт по анализу проекта", 0)
+    return doc
+
+
+def build_word_report(file_path, snapshot, progress=None, with_charts=True, parallel_charts=True):
+    """Собирает отчёт Word по снимку данных ReportSnapshot и сохраняет его в file_path.
+
+    progress — ReportProgress для отображения хода и отмены. Разделы, данные
+    которых не менялись с прошлого экспорта, берутся из кэша разделов.
+    """
+    progress = progress or ReportProgress()
+    doc = new_report()
+    # Свободный идентификатор фигур берётся, пока в документе нет таблиц:
+    # после них поиск идентификаторов по всему документу очень долог
+    first_shape_id = doc.part.next_id
+    with progress.section(0) as span:
+        add_project_section(doc, snapshot.project_data, snapshot.key("project"))
+        span.set(rows=snapshot.rows("project"))
+    with progress.section(1) as span:
+        add_metrics_section(doc, snapshot.calc_data, snapshot.key("metrics"))
+        span.set(rows=snapshot.rows("metrics"))
+    with progress.section(2) as span:
+        recommendations = snapshot.recommendation_rows()
+        add_recommendations_section(doc, recommendations, snapshot.key("recommendations"))
+        span.set(rows=len(recommendations))
+    with progress.section(3) as span:
+        images = []
+        if with_charts and snapshot.calc_data is not None:
+            images = chart_images(snapshot.calc_data, snapshot.key("charts"), parallel=parallel_charts)
+        add_charts_section(doc, images, first_shape_id)
+        span.set(charts=len(images))
+    with progress.section(4):
+        doc.save(file_path)
@@ -0,0 +1,102 @@
+import hashlib
+import itertools
+import sys
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Строк, по которым оценивается размер таблиц
+SIZE_SAMPLE = 100
+
+
+def frame_key(df):
+    """Хэш содержимого таблицы: значения, названия и типы столбцов.
+
+    Возвращает None, если значения не хэшируются (например, списки
+    в ячейках JSON) — такие разделы не кэшируются.
+    """
+    if df is None:
+        return None
+    try:
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    except TypeError:
+        return None
+    digest = hashlib.sha1(hashes.tobytes())
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def estimate_size(value):
+    """Примерный объём значения в байтах; для таблиц — по выборке строк"""
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        sample = list(itertools.islice(value, SIZE_SAMPLE))
+        if not sample:
+            return sys.getsizeof(value)
+        sampled = sum(estimate_size(item) for item in sample)
+        return sys.getsizeof(value) + sampled * len(value) // len(sample)
+    return sys.getsizeof(value)
+
+
+class SectionCache:
+    """Готовые разделы отчётов в памяти с вытеснением LRU.
+
+    Ключ — вид раздела и хэши его входных данных, поэтому при повторном
+    экспорте пересобираются только разделы, данные которых изменились.
+    Доступ из потока формирования отчёта и из GUI-потока защищён блокировкой.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # ключ -> (значение, объём)
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Значение из кэша или None"""
+        if key is None:
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """Сохраняет значение; записи крупнее всего кэша не сохраняются"""
+        if key is None:
+            return
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self.entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= evicted
+
+    def get_or_build(self, key, build):
+        """Значение из кэша; при промахе — build() с сохранением результата"""
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+# Общий кэш разделов: отчёты Word и PDF по одним данным используют одни записи
+sections = SectionCache()
@@ -0,0 +1,40 @@
+import os
+from PyQt5.QtCore import QObject, pyqtSignal
+from view.report_builder import ReportCancelled, ReportProgress
+from view import tracing
+
+
+class ReportJob(QObject):
+    """Фоновое формирование отчёта (выполняется в отдельном QThread)"""
+
+    progress = pyqtSignal(int, int, int)  # этап REPORT_SECTIONS, выполнено, всего
+    done = pyqtSignal(str)                # путь сохранённого отчёта
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, build, file_path, snapshot):
+        super().__init__()
+        self.build = build  # build_word_report или build_pdf_report
+        self.file_path = file_path
+        self.snapshot = snapshot
+        self._cancel_requested = False
+
+    def run(self):
+        with tracing.span("Формирование отчёта", file=os.path.basename(self.file_path)) as span:
+            try:
+                self.build(
+                    self.file_path, self.snapshot,
+                    ReportProgress(self.progress.emit, lambda: self._cancel_requested)
+                )
+            except ReportCancelled:
+                span.set(cancelled=True)
+                self.cancelled.emit()
+            except Exception as e:
+                span.set(error=type(e).__name__)
+                self.failed.emit(str(e))
+            else:
+                self.done.emit(self.file_path)
+
+    def cancel(self):
+        """Запрашивает отмену; вызывается из GUI-потока"""
+        self._cancel_requested = True
@@ -1,18 +1,20 @@
-from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QPushButton, QFileDialog
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QWidget, QLabel, QVBoxLayout, QPushButton, QFileDialog, QGridLayout, QProgressBar
+)
+from PyQt5.QtCore import Qt, QThread
 from PyQt5.QtWidgets import QMessageBox
-from docx import Document
-from docx.shared import Inches
-import pandas as pd
-import os
-import tempfile
-from docx2pdf import convert
+from view import pdf_report, report_builder
+from view.report_job import ReportJob
 import time
 
 
 class ReportsPage(QWidget):
     def __init__(self):
         super().__init__()
+        self.job = None
+        self.job_thread = None
+        self.job_format = None
+        self.job_started = None
         self.init_ui()
 
     def init_ui(self):
@@ -74,6 +76,27 @@ class ReportsPage(QWidget):
         self.pdf_btn.clicked.connect(self.generate_pdf_report)
         layout.addWidget(self.pdf_btn)
 
+        # Ход формирования отчёта по разделам
+        self.sections_panel = QWidget()
+        sections_layout = QGridLayout(self.sections_panel)
+        sections_layout.setContentsMargins(0, 0, 0, 0)
+        self.section_bars = []
+        for row, name in enumerate(report_builder.REPORT_SECTIONS):
+            sections_layout.addWidget(QLabel(name), row, 0)
+            bar = QProgressBar()
+            sections_layout.addWidget(bar, row, 1)
+            self.section_bars.append(bar)
+        self.sections_panel.setVisible(False)
+        layout.addWidget(self.sections_panel)
+
+        self.cancel_report_btn = QPushButton("✖ Отменить формирование отчёта")
+        self.cancel_report_btn.clicked.connect(self.cancel_report)
+        self.cancel_report_btn.setVisible(False)
+        layout.addWidget(self.cancel_report_btn)
+
+        self.report_status = QLabel("")
+        layout.addWidget(self.report_status)
+
         self.setLayout(layout)
 
     def get_project_data(self):
@@ -84,153 +107,113 @@ class ReportsPage(QWidget):
         """Получает рассчитанные метрики из CalculationsPage"""
         calc_page = self.window().pages.get("Рассчитанные значения")
         if calc_page and hasattr(calc_page, "calculations_data"):
-            return calc_page.calculations_data
+            # Страница могла ещё не открываться — метрики рассчитываются по запросу
+            return self.window().refresh_page(calc_page).calculations_data
         return None
 
-    def get_recommendations_data(self):
-        """Получает рекомендации из RecommendationsPage"""
+    def take_snapshot(self):
+        """Снимок данных отчёта в GUI-потоке; дальше с проектом можно работать"""
+        result, rules = None, None
         rec_page = self.window().pages.get("Рекомендации")
-        if rec_page and hasattr(rec_page, "table"):
-            recommendations = []
-            for row in range(rec_page.table.rowCount()):
-                stage = rec_page.table.item(row, 0).text()
-                problem = rec_page.table.item(row, 1).text()
-                recommendation = rec_page.table.item(row, 2).text()
-                recommendations.append([stage, problem, recommendation])
-            return recommendations
-        return []
-
-    def get_charts(self):
-        """Получает пути к сохранённым графикам из AnalysisPage"""
-        analysis_page = self.window().pages.get("Анализ")
-        if analysis_page and hasattr(analysis_page, "save_charts"):
-            return analysis_page.save_charts()
-        return []
+        if rec_page is not None:
+            # Страница могла не открываться после импорта: при обновлении
+            # она сбрасывает рекомендации прежнего набора данных
+            self.window().refresh_page(rec_page)
+            if rec_page.recommendations_data is not None:
+                result, rules = rec_page.recommendations_data, rec_page.rules
+        return report_builder.ReportSnapshot(
+            self.get_project_data(), self.get_calculations_data(), result, rules
+        )
 
     def generate_word_report(self, file_path=None):
-        """Генерирует отчёт в формате Word. Если file_path не указан, запрашивает у пользователя."""
-        start_time = time.time()
+        """Формирует отчёт Word в фоне. Если file_path не указан, запрашивает у пользователя."""
+        return self.start_report(report_builder.build_word_report, "Word", "Word Files (*.docx)", file_path)
+
+    def generate_pdf_report(self, file_path=None):
+        """Формирует отчёт PDF в фоне, напрямую, без промежуточного Word-файла"""
+        return self.start_report(pdf_report.build_pdf_report, "PDF", "PDF Files (*.pdf)", file_path)
+
+    def start_report(self, build, report_format, file_filter, file_path=None):
+        if self.job is not None:
+            return False
         if not file_path:
-            file_path, _ = QFileDialog.getSaveFileName(
-                self, "Сохранить отчёт", "", "Word Files (*.docx)"
-            )
+            file_path, _ = QFileDialog.getSaveFileName(self, "Сохранить отчёт", "", file_filter)
             if not file_path:
                 return False
 
         try:
-            doc = Document()
-            doc.add_heading("Отчёт по анализу проекта", 0)
-
-            # Раздел 1: Данные проекта
-            t1 = time.time()
-            project_data = self.get_project_data()
-            if project_data is not None:
-                doc.add_heading("1. Данные проекта", level=1)
-                table = doc.add_table(rows=1 + len(project_data), cols=len(project_data.columns))
-                table.style = "Table Grid"
-                for j, col in enumerate(project_data.columns):
-                    table.rows[0].cells[j].text = col
-                for i, row in project_data.iterrows():
-                    for j, val in enumerate(row):
-                        table.rows[i + 1].cells[j].text = str(val)
-            else:
-                doc.add_paragraph("Данные проекта отсутствуют.")
-            print(f"Project data section took {time.time() - t1:.2f} seconds")
-
-            # Раздел 2: Рассчитанные метрики
-            t2 = time.time()
-            calc_data = self.get_calculations_data()
-            if calc_data is not None:
-                doc.add_heading("2. Рассчитанные метрики", level=1)
-                selected_columns = ["Этап", "ΔT", "ΔC", "E"]
-                filtered_calc_data = calc_data[selected_columns]
-                table = doc.add_table(rows=1 + len(filtered_calc_data), cols=len(filtered_calc_data.columns))
-                table.style = "Table Grid"
-                for j, col in enumerate(filtered_calc_data.columns):
-                    table.rows[0].cells[j].text = col
-                for i, row in filtered_calc_data.iterrows():
-                    for j, val in enumerate(row):
-                        table.rows[i + 1].cells[j].text = str(val)
-            else:
-                doc.add_paragraph("Рассчитанные метрики отсутствуют.")
-            print(f"Calculations section took {time.time() - t2:.2f} seconds")
-
-            # Раздел 3: Рекомендации
-            t3 = time.time()
-            recommendations = self.get_recommendations_data()
-            if recommendations:
-                doc.add_heading("3. Рекомендации", level=1)
-                table = doc.add_table(rows=1 + len(recommendations), cols=3)
-                table.style = "Table Grid"
-                table.rows[0].cells[0].text = "Этап"
-                table.rows[0].cells[1].text = "Проблема"
-                table.rows[0].cells[2].text = "Рекомендация"
-                for i, (stage, problem, recommendation) in enumerate(recommendations):
-                    table.rows[i + 1].cells[0].text = stage
-                    table.rows[i + 1].cells[1].text = problem
-                    table.rows[i + 1].cells[2].text = recommendation
-            else:
-                doc.add_paragraph("Рекомендации отсутствуют.")
-            print(f"Recommendations section took {time.time() - t3:.2f} seconds")
-
-            # Раздел 4: Графики
-            t4 = time.time()
-            charts = self.get_charts()
-            if charts:
-                doc.add_heading("4. Графики", level=1)
-                for chart_name, chart_path in charts:
-                    doc.add_paragraph(chart_name)
-                    doc.add_picture(chart_path, width=Inches(5.5))
-            else:
-                doc.add_paragraph("Графики отсутствуют.")
-            print(f"Charts section took {time.time() - t4:.2f} seconds")
-
-            doc.save(file_path)
-            # Очистка временных файлов
-            t5 = time.time()
-            for _, chart_path in charts:
-                os.remove(chart_path)
-            print(f"File cleanup took {time.time() - t5:.2f} seconds")
-
-            # Показываем сообщение об успешном сохранении
-            QMessageBox.information(self, "Успех", "Файл Word успешно сохранён!")
-            print(f"Total Word report generation took {time.time() - start_time:.2f} seconds")
-            return True
+            snapshot = self.take_snapshot()
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось создать отчёт: {str(e)}")
             return False
 
-    def generate_pdf_report(self):
-        """Генерирует отчёт в формате PDF путём преобразования Word-документа"""
-        start_time = time.time()
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Сохранить отчёт", "", "PDF Files (*.pdf)"
-        )
-        if not file_path:
-            return
+        # Разделы записываются в отдельном потоке, интерфейс остаётся отзывчивым
+        self.job_thread = QThread(self)
+        self.job = ReportJob(build, file_path, snapshot)
+        self.job.moveToThread(self.job_thread)
+
+        self.job_thread.started.connect(self.job.run)
+        self.job.progress.connect(self.on_report_progress)
+        self.job.done.connect(self.on_report_done)
+        self.job.failed.connect(self.on_report_failed)
+        self.job.cancelled.connect(self.on_report_cancelled)
+        for signal in (self.job.done, self.job.failed, self.job.cancelled):
+            signal.connect(self.job_thread.quit)
+        self.job_thread.finished.connect(self.job.deleteLater)
+        self.job_thread.finished.connect(self.job_thread.deleteLater)
+
+        self.job_format = report_format
+        self.job_started = time.perf_counter()
+        self.set_report_running(True)
+        self.report_status.setText(f"Формирование отчёта {report_format}...")
+        self.job_thread.start()
+        return True
+
+    def cancel_report(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.cancel_report_btn.setEnabled(False)
+            self.report_status.setText("Отмена формирования отчёта...")
+
+    def set_report_running(self, running):
+        self.word_btn.setEnabled(not running)
+        self.pdf_btn.setEnabled(not running)
+        self.cancel_report_btn.setVisible(running)
+        self.cancel_report_btn.setEnabled(running)
+        if running:
+            for bar in self.section_bars:
+                bar.setRange(0, 1)
+                bar.setValue(0)
+            self.sections_panel.setVisible(True)
+        else:
+            self.job = None
+            self.job_thread = None
+
+    def on_report_progress(self, section, done, total):
+        bar = self.section_bars[section]
+        bar.setRange(0, max(total, 1))
+        bar.setValue(done)
+        if done < total:
+            self.report_status.setText(
+                f"Отчёт {self.job_format}: {report_builder.REPORT_SECTIONS[section].lower()}..."
+            )
 
-        try:
-            # Создаём временный Word-файл
-            with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as temp_docx:
-                temp_docx_path = temp_docx.name
-
-            # Генерируем Word-документ во временный файл
-            t1 = time.time()
-            if not self.generate_word_report(temp_docx_path):
-                return
-            print(f"Word file generation for PDF took {time.time() - t1:.2f} seconds")
-
-            # Преобразуем Word в PDF
-            t2 = time.time()
-            convert(temp_docx_path, file_path)
-            print(f"PDF conversion took {time.time() - t2:.2f} seconds")
-
-            # Удаляем временный Word-файл
-            t3 = time.time()
-            os.remove(temp_docx_path)
-            print(f"Temp file cleanup took {time.time() - t3:.2f} seconds")
-
-            QMessageBox.information(self, "Успех", "Файл PDF успешно сохранён!")
-            print(f"Total PDF report generation took {time.time() - start_time:.2f} seconds")
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Не удалось создать PDF: {str(e)}")
+    def on_report_done(self, file_path):
+        elapsed = time.perf_counter() - self.job_started
+        report_format = self.job_format
+        self.set_report_running(False)
+        self.sections_panel.setVisible(False)
+        # Время по разделам — на странице «Производительность»
+        self.report_status.setText(f"Отчёт сохранён за {elapsed:.1f} с: {file_path}")
+        QMessageBox.information(self, "Успех", f"Файл {report_format} успешно сохранён!")
+
+    def on_report_failed(self, message):
+        self.set_report_running(False)
+        self.sections_panel.setVisible(False)
+        self.report_status.setText("")
+        QMessageBox.critical(self, "Ошибка", f"Не удалось создать отчёт: {message}")
+
+    def on_report_cancelled(self):
+        self.set_report_running(False)
+        self.sections_panel.setVisible(False)
+        self.report_status.setText("Формирование отчёта отменено.")
@@ -0,0 +1,260 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QAbstractItemModel, QModelIndex, QVariant
+import numpy as np
+import pandas as pd
+from view.formatting import format_value
+
+
+def contiguous_ranges(positions):
+    """Разбивает отсортированные позиции на непрерывные диапазоны (первая, последняя)"""
+    if len(positions) == 0:
+        return []
+    breaks = np.nonzero(np.diff(positions) != 1)[0] + 1
+    return [(int(part[0]), int(part[-1])) for part in np.split(positions, breaks)]
+
+
+def column_accessor(series):
+    """Возвращает функцию чтения значения столбца по позиции строки.
+
+    Категориальные столбцы читаются через коды, без материализации значений.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        categories = series.cat.categories.to_numpy()
+        return lambda row: categories[codes[row]] if codes[row] >= 0 else None
+    values = series.to_numpy()
+    return values.__getitem__
+
+
+class DataFrameModel(QAbstractTableModel):
+    """Табличная модель поверх DataFrame.
+
+    Значения читаются из массивов столбцов только для видимых ячеек,
+    сортировка выполняется pandas, а не сравнением элементов таблицы.
+    computed — вычисляемые столбцы: {имя: f(frame) -> функция чтения по позиции}.
+    edit_handler(позиция строки, столбец, текст) -> bool делает столбцы данных
+    редактируемыми; сама модель данные не меняет — обработчик применяет правку
+    и обновляет модель через apply_changes.
+    """
+
+    def __init__(self, columns=None, formatters=None, computed=None, edit_handler=None, parent=None):
+        super().__init__(parent)
+        self._frame = pd.DataFrame()
+        self._columns = list(columns) if columns is not None else None
+        self._formatters = formatters or {}
+        self._computed = computed or {}
+        self._edit_handler = edit_handler
+        self._headers = []
+        self._accessors = []
+        self._cell_formatters = []
+        self._row_count = 0
+        self._order = None
+
+    def frame(self):
+        return self._frame
+
+    def set_frame(self, df):
+        self.beginResetModel()
+        self._frame = df.reset_index(drop=True) if df is not None else pd.DataFrame()
+        # Явно заданные столбцы показываются всегда, даже при пустой таблице
+        self._headers = list(self._columns) if self._columns is not None else list(self._frame.columns)
+        self._accessors = [self.accessor(col) for col in self._headers]
+        self._cell_formatters = [self._formatters.get(col, format_value) for col in self._headers]
+        self._row_count = len(self._frame)
+        self._order = None
+        self.endResetModel()
+
+    def apply_changes(self, df, changes):
+        """Переходит к новому DataFrame по описанию изменений StageChanges.
+
+        Вместо полного сброса модели отправляются сигналы удаления, вставки
+        и изменения конкретных строк. Если таблица отсортирована, а число
+        строк меняется, модель сбрасывается.
+        """
+        if self._order is not None and (len(changes.removed) or len(changes.inserted)):
+            self.set_frame(df)
+            return
+        # Удаление — с конца, чтобы позиции оставшихся диапазонов не смещались
+        for first, last in reversed(contiguous_ranges(changes.removed)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self._row_count -= last - first + 1
+            self.endRemoveRows()
+
+        new_frame = df.reset_index(drop=True)
+        self.replace_frame(new_frame, len(new_frame) - len(changes.inserted))
+
+        # Вставка — по возрастанию итоговых позиций
+        for first, last in contiguous_ranges(changes.inserted):
+            self.beginInsertRows(QModelIndex(), first, last)
+            self._row_count += last - first + 1
+            self.endInsertRows()
+
+        if len(changes.updated) and self._headers:
+            rows = changes.updated
+            if self._order is not None:
+                # Позиции в DataFrame -> строки отсортированного представления
+                inverse = np.empty_like(self._order)
+                inverse[self._order] = np.arange(len(self._order))
+                rows = np.sort(inverse[rows])
+            last_column = len(self._headers) - 1
+            for first, last in contiguous_ranges(rows):
+                self.dataChanged.emit(self.index(first, 0), self.index(last, last_column))
+
+    def replace_frame(self, df, row_count):
+        """Заменяет данные без сигналов модели (используется в apply_changes)"""
+        self._frame = df
+        self._accessors = [self.accessor(col) for col in self._headers]
+        self._row_count = row_count
+
+    def accessor(self, col):
+        if self._frame.empty:
+            return lambda row: None
+        if col in self._computed:
+            return self._computed[col](self._frame)
+        if col not in self._frame.columns:
+            return lambda row: None
+        return column_accessor(self._frame[col])
+
+    def source_row(self, row):
+        """Позиция строки в DataFrame для строки представления"""
+        return int(self._order[row]) if self._order is not None else row
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return QVariant()
+        value = self._accessors[index.column()](self.source_row(index.row()))
+        return self._cell_formatters[index.column()](value)
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if (
+            self._edit_handler is not None and index.isValid()
+            and self._headers[index.column()] in self._frame.columns
+        ):
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or self._edit_handler is None or not index.isValid():
+            return False
+        return bool(self._edit_handler(self.source_row(index.row()), self._headers[index.column()], value))
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return self._headers[section]
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if not self._headers or (column >= 0 and self._headers[column] not in self._frame.columns):
+            return  # вычисляемые столбцы не сортируются
+        self.beginResetModel()
+        if column < 0:
+            # Сброс сортировки — исходный порядок строк
+            self._order = None
+            self.endResetModel()
+            return
+        series = self._frame[self._headers[column]]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Категории сортируем по значению, а не по порядку появления
+            series = series.cat.set_categories(series.cat.categories.sort_values())
+        self._order = series.sort_values(
+            ascending=(order == Qt.AscendingOrder), kind="stable", na_position="last"
+        ).index.to_numpy()
+        self.endResetModel()
+
+
+class StageTreeModel(QAbstractItemModel):
+    """Дерево этапов проекта поверх DataFrame.
+
+    Этапы — строки верхнего уровня, подгружаемые порциями через
+    canFetchMore/fetchMore. Строки деталей (ответственный, сроки, бюджет)
+    не хранятся: их текст формируется в data() при раскрытии этапа.
+    Внутренний идентификатор индекса: 0 — этап, n > 0 — деталь этапа n - 1.
+    """
+
+    FETCH_BATCH = 1000
+    DETAIL_COLUMNS = ["Ответственный", "Дата начала", "Дата окончания", "План. бюджет"]
+
+    def __init__(self, header="Этапы проекта", parent=None):
+        super().__init__(parent)
+        self._header = header
+        self._frame = pd.DataFrame()
+        self._accessors = {}
+        self._fetched = 0
+
+    def set_frame(self, df):
+        self.beginResetModel()
+        self._frame = df.reset_index(drop=True) if df is not None else pd.DataFrame()
+        self._accessors = {
+            col: column_accessor(self._frame[col])
+            for col in ["Этап"] + self.DETAIL_COLUMNS if col in self._frame.columns
+        }
+        self._fetched = min(len(self._frame), self.FETCH_BATCH)
+        self.endResetModel()
+
+    def detail_text(self, stage_row, detail_row):
+        value = lambda col: format_value(self._accessors[col](stage_row))
+        if detail_row == 0:
+            return f"Ответственный: {value('Ответственный')}"
+        if detail_row == 1:
+            return f"Срок: {value('Дата начала')} – {value('Дата окончания')}"
+        return f"Бюджет: {value('План. бюджет')} руб."
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, 0)
+        return self.createIndex(row, column, parent.row() + 1)
+
+    def parent(self, index):
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return self._fetched
+        if parent.internalId() == 0 and parent.column() == 0:
+            return 3
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self._frame) > 0
+        return parent.internalId() == 0
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._fetched < len(self._frame)
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        count = min(len(self._frame) - self._fetched, self.FETCH_BATCH)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + count - 1)
+        self._fetched += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return QVariant()
+        if index.internalId() == 0:
+            return format_value(self._accessors["Этап"](index.row()))
+        return self.detail_text(index.internalId() - 1, index.row())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self._header
+        return QVariant()
@@ -0,0 +1,90 @@
+"""Инкрементальный пересчёт после изменения этапов совпадает с полным расчётом."""
+import numpy as np
+import pandas as pd
+import pytest
+from view.project_io import apply_schema
+from view.project_dataset import ProjectDataset, parse_cell
+from view import recommendation_engine
+
+
+def make_project(n, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D")
+    duration = pd.to_timedelta(rng.integers(1, 60, n), unit="D")
+    fact_start = start + pd.to_timedelta(rng.integers(-5, 10, n), unit="D")
+    fact_duration = pd.to_timedelta(np.maximum(duration.days + rng.integers(-10, 20, n), 1), unit="D")
+    budget = rng.integers(10, 1000, n) * 1000.0
+    return apply_schema(pd.DataFrame({
+        "Этап": [f"Этап {i}" for i in range(n)],
+        "Ответственный": rng.choice(["Иванов", "Петров", "Сидоров"], n),
+        "Дата начала": start,
+        "Дата окончания": start + duration,
+        "Факт начала": fact_start,
+        "Факт окончания": fact_start + fact_duration,
+        "План. бюджет": budget,
+        "Факт. бюджет": budget * rng.uniform(0.8, 1.3, n),
+        "Ресурсы": rng.integers(1, 50, n).astype("float64"),
+    }))
+
+
+def full_recommendations(frame, rules):
+    result = recommendation_engine.evaluate(frame, rules)
+    return recommendation_engine.with_stage_names(result, frame["Этап"])
+
+
+CHANGES = {
+    # Сдвиг факта окончания переводит этапы между правилами группы сроков
+    "updated": lambda df: dict(updated=pd.DataFrame(
+        {"Факт окончания": df.loc[[3, 7, 40], "Факт окончания"] + pd.Timedelta(days=30)}
+    )),
+    "budget": lambda df: dict(updated=pd.DataFrame(
+        {"Факт. бюджет": df.loc[[0, 99], "План. бюджет"] * 0.5}
+    )),
+    "inserted": lambda df: dict(inserted=make_project(5, seed=1)),
+    "deleted": lambda df: dict(deleted=[0, 10, 11, 99]),
+    "mixed": lambda df: dict(
+        updated=pd.DataFrame({"Факт. бюджет": df.loc[[5, 10], "План. бюджет"] * 2}),
+        inserted=make_project(3, seed=2),
+        deleted=[10, 50],
+    ),
+}
+
+
+@pytest.mark.parametrize("kind", list(CHANGES))
+def test_apply_changes_matches_full_rebuild(kind):
+    dataset = ProjectDataset(make_project(100))
+    changes = CHANGES[kind](dataset.raw)
+    dataset.apply_changes(**changes)
+    rebuilt = ProjectDataset(dataset.raw.reset_index(drop=True))
+    pd.testing.assert_frame_equal(
+        dataset.frame.reset_index(drop=True), rebuilt.frame, check_categorical=False
+    )
+
+
+@pytest.mark.parametrize("kind", list(CHANGES))
+def test_incremental_recommendations_match_full_evaluate(kind):
+    rules = recommendation_engine.load_rules()
+    dataset = ProjectDataset(make_project(100))
+    result = full_recommendations(dataset.frame, rules)
+
+    stage_changes = dataset.apply_changes(**CHANGES[kind](dataset.raw))
+    incremental, row_changes = recommendation_engine.evaluate_changes(
+        result, dataset.frame, stage_changes, rules
+    )
+
+    expected = full_recommendations(dataset.frame, rules)
+    pd.testing.assert_frame_equal(incremental, expected)
+    # Строк таблицы рекомендаций: прежние минус удалённые плюс добавленные
+    assert len(result) - len(row_changes.removed) + len(row_changes.inserted) == len(expected)
+
+
+def test_parse_cell():
+    assert parse_cell("Дата начала", "07.01.2024") == pd.Timestamp("2024-01-07")
+    assert parse_cell("Дата начала", "2024-01-07") == pd.Timestamp("2024-01-07")
+    assert pd.isna(parse_cell("Дата начала", ""))
+    assert parse_cell("План. бюджет", "1 500,5") == 1500.5
+    assert parse_cell("Этап", " Фундамент ") == "Фундамент"
+    with pytest.raises(ValueError):
+        parse_cell("Факт окончания", "31.02.2024")
+    with pytest.raises(ValueError):
+        parse_cell("Ресурсы", "много")
@@ -0,0 +1,171 @@
+"""Трассировка этапов обработки: вложенные интервалы (спаны) с атрибутами.
+
+    with tracing.span("Правила рекомендаций", stages=len(df)) as s:
+        ...
+        s.set(rows=len(result))
+
+Спан верхнего уровня вместе с вложенными — один «запуск»; хранятся
+последние MAX_RUNS запусков. Время — монотонный таймер perf_counter_ns.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+MAX_RUNS = 50
+
+
+class Span:
+    """Интервал выполнения этапа; start и end — наносекунды perf_counter_ns"""
+
+    __slots__ = ("name", "attrs", "children", "thread_id", "thread_name", "start", "end", "wall_start")
+
+    def __init__(self, name, attrs):
+        thread = threading.current_thread()
+        self.name = name
+        self.attrs = dict(attrs)
+        self.children = []
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.wall_start = time.time()
+        self.start = time.perf_counter_ns()
+        self.end = None
+
+    def set(self, **attrs):
+        """Добавляет атрибуты (например, число строк)"""
+        self.attrs.update(attrs)
+        return self
+
+    @property
+    def duration(self):
+        """Длительность в секундах; для незавершённого спана — до текущего момента"""
+        end = self.end if self.end is not None else time.perf_counter_ns()
+        return (end - self.start) / 1e9
+
+    def walk(self, depth=0):
+        """Спан и все вложенные: (глубина, спан)"""
+        yield depth, self
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+
+class Tracer:
+    """Стек спанов каждого потока и последние завершённые запуски"""
+
+    def __init__(self, max_runs=MAX_RUNS):
+        self.runs = deque(maxlen=max_runs)
+        self.generation = 0  # растёт с каждым завершённым запуском
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name, **attrs):
+        stack = self.stack()
+        span = Span(name, attrs)
+        if stack:
+            stack[-1].children.append(span)
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            span.end = time.perf_counter_ns()
+            stack.pop()
+            if not stack:
+                with self.lock:
+                    self.runs.append(span)
+                    self.generation += 1
+
+    def current(self):
+        """Открытый спан текущего потока или None"""
+        stack = self.stack()
+        return stack[-1] if stack else None
+
+    def last_runs(self):
+        """Завершённые запуски, последний — первым"""
+        with self.lock:
+            return list(reversed(self.runs))
+
+    def clear(self):
+        with self.lock:
+            self.runs.clear()
+            self.generation += 1
+
+    def chrome_trace(self, runs=None):
+        """Запуски в формате Chrome trace-event (chrome://tracing, Perfetto)"""
+        runs = self.last_runs()[::-1] if runs is None else runs
+        pid = os.getpid()
+        events = []
+        threads = {}
+        for run in runs:
+            for _, span in run.walk():
+                threads[span.thread_id] = span.thread_name
+                events.append({
+                    "name": span.name,
+                    "cat": "expsystem",
+                    "ph": "X",
+                    "ts": span.start / 1000,
+                    "dur": (span.end - span.start) / 1000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": {key: json_value(value) for key, value in span.attrs.items()},
+                })
+        events.extend(
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, file_path, runs=None):
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(runs), f, ensure_ascii=False)
+
+
+def json_value(value):
+    """Атрибут спана в виде, допустимом в JSON"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, "item"):
+        return value.item()  # скаляры numpy
+    return str(value)
+
+
+# Общий трассировщик приложения
+tracer = Tracer()
+
+
+def span(name, **attrs):
+    return tracer.span(name, **attrs)
+
+
+def annotate(**attrs):
+    """Добавляет атрибуты к открытому спану текущего потока, если он есть"""
+    current = tracer.current()
+    if current is not None:
+        current.set(**attrs)
+
+
+def traced(name):
+    """Декоратор: каждый вызов функции — спан; rows — длина результата, если она есть"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name) as s:
+                result = func(*args, **kwargs)
+                if hasattr(result, "__len__"):
+                    s.set(rows=len(result))
+                return result
+        return wrapper
+    return decorate